@@ -4,8 +4,10 @@ Crowdbot - Telegram Bot
 Ein selbst gehosteter KI-Assistent mit Markdown-Gedächtnis.
 """
 
+import asyncio
+import functools
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 from telegram import Update
 from telegram.ext import (
@@ -59,6 +61,30 @@ def is_authorized(user_id: int) -> bool:
         return False
 
 
+def serialize_per_user(handler):
+    """
+    Decorator: Bearbeitet Updates desselben Benutzers nacheinander.
+
+    Die Application bearbeitet Updates parallel (concurrent_updates). Damit
+    bleibt die Reihenfolge pro Benutzer trotzdem erhalten: Nachrichten werden
+    in der Reihenfolge ihres Eingangs gespeichert, und /reset läuft nie
+    gleichzeitig mit einer anderen Anfrage desselben Benutzers. Updates
+    verschiedener Benutzer laufen weiterhin parallel.
+    """
+    @functools.wraps(handler)
+    async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        user_id = update.effective_user.id
+
+        # Nicht autorisierte Benutzer bekommen keinen Lock-Eintrag
+        if not is_authorized(user_id):
+            return await handler(self, update, context)
+
+        async with self._get_user_lock(user_id):
+            return await handler(self, update, context)
+
+    return wrapper
+
+
 class Crowdbot:
     """Hauptklasse für den Crowdbot."""
 
@@ -98,12 +124,22 @@ class Crowdbot:
             description="Suche im Internet nach aktuellen Informationen, Nachrichten, Fakten oder technischen Details. Nutze dieses Tool wenn der Benutzer nach etwas fragt das eine Recherche erfordert."
         )
 
-        # Application erstellen
-        self.application = Application.builder().token(self.token).build()
+        # Ein Lock pro Benutzer (siehe serialize_per_user)
+        self._user_locks: Dict[int, asyncio.Lock] = {}
+
+        # Application erstellen (Updates verschiedener Benutzer parallel bearbeiten)
+        self.application = Application.builder().token(self.token).concurrent_updates(True).build()
 
         # Handler registrieren
         self._register_handlers()
 
+    def _get_user_lock(self, user_id: int) -> asyncio.Lock:
+        """Gibt den Lock eines Benutzers zurück (wird bei Bedarf angelegt)."""
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        return lock
+
     async def check_authorization(self, update: Update) -> bool:
         """
         Prüft Autorisierung und sendet Fehlermeldung wenn nötig.
@@ -258,6 +294,7 @@ class Crowdbot:
             MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message)
         )
 
+    @serialize_per_user
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /start Befehl.
@@ -279,7 +316,7 @@ class Crowdbot:
             )
         else:
             # Neuen Benutzer erstellen
-            self.memory_manager.create_user(user_id, username)
+            await self.memory_manager.acreate_user(user_id, username)
             message = (
                 f"Hallo {username}! 👋\n\n"
                 "Willkommen bei Crowdbot! Ich bin dein persönlicher KI-Assistent. "
@@ -289,6 +326,7 @@ class Crowdbot:
 
         await update.message.reply_text(message)
 
+    @serialize_per_user
     async def reset_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /reset Befehl.
@@ -302,7 +340,8 @@ class Crowdbot:
         username = update.effective_user.username or update.effective_user.first_name
 
         # Gedächtnis zurücksetzen
-        self.memory_manager.reset_user(user_id, username)
+        await self.memory_manager.areset_user(user_id, username)
+        self.skill_manager.forget_user(user_id)
 
         message = (
             f"Alles klar, {username}! 🧹\n\n"
@@ -360,6 +399,7 @@ class Crowdbot:
 
         await update.message.reply_text(message)
 
+    @serialize_per_user
     async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /search Befehl.
@@ -407,8 +447,8 @@ class Crowdbot:
                 result = result[:4000] + "\n\n... (gekürzt. Nutze /searchmd für die vollständige Version)"
 
             # Ergebnis speichern
-            self.memory_manager.append_message(user_id, "user", f"/search {query}")
-            self.memory_manager.append_message(user_id, "assistant", result)
+            await self.memory_manager.aappend_message(user_id, "user", f"/search {query}")
+            await self.memory_manager.aappend_message(user_id, "assistant", result)
 
             await update.message.reply_text(result)
         else:
@@ -418,6 +458,7 @@ class Crowdbot:
             )
             logger.error(f"Suche lieferte keine Ergebnisse für: {query}")
 
+    @serialize_per_user
     async def search_md_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /searchmd Befehl.
@@ -498,8 +539,8 @@ class Crowdbot:
                 )
 
                 # Ergebnis speichern
-                self.memory_manager.append_message(user_id, "user", f"/searchmd {query}")
-                self.memory_manager.append_message(user_id, "assistant", f"[Markdown-Datei gesendet: {filename}]")
+                await self.memory_manager.aappend_message(user_id, "user", f"/searchmd {query}")
+                await self.memory_manager.aappend_message(user_id, "assistant", f"[Markdown-Datei gesendet: {filename}]")
 
             finally:
                 # Temporäre Datei löschen
@@ -512,6 +553,7 @@ class Crowdbot:
             )
             logger.error(f"Suche lieferte keine Ergebnisse für: {query}")
 
+    @serialize_per_user
     async def deep_research_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /deepresearch Befehl.
@@ -563,8 +605,8 @@ class Crowdbot:
                 result = result[:4000] + "\n\n... (gekürzt wegen Länge)"
 
             # Ergebnis speichern
-            self.memory_manager.append_message(user_id, "user", f"/deepresearch {query}")
-            self.memory_manager.append_message(user_id, "assistant", result)
+            await self.memory_manager.aappend_message(user_id, "user", f"/deepresearch {query}")
+            await self.memory_manager.aappend_message(user_id, "assistant", result)
 
             await update.message.reply_text(result)
         else:
@@ -574,6 +616,7 @@ class Crowdbot:
             )
             logger.error(f"Deep Research lieferte keine Ergebnisse für: {query}")
 
+    @serialize_per_user
     async def import_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /import Befehl.
@@ -620,12 +663,12 @@ class Crowdbot:
 
         if success:
             # Erfolg - speichere auch in Memory für Kontext
-            self.memory_manager.append_message(
+            await self.memory_manager.aappend_message(
                 user_id,
                 "user",
                 f"/import {url}" + (f" {custom_filename}" if custom_filename else "")
             )
-            self.memory_manager.append_message(user_id, "assistant", message)
+            await self.memory_manager.aappend_message(user_id, "assistant", message)
 
             # TTS-kompatible Nachricht
             tts_message = self._remove_markdown(message)
@@ -638,6 +681,7 @@ class Crowdbot:
             await update.message.reply_text(error_message)
             logger.error(f"Web-Import fehlgeschlagen: {url} - {message}")
 
+    @serialize_per_user
     async def task_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /task Befehl.
@@ -745,7 +789,7 @@ Wichtig:
 Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "calculate_sum"), NICHTS anderes:"""
 
             try:
-                name_response = self.llm_client.chat(
+                name_response = await self.llm_client.achat(
                     user_message=name_prompt,
                     max_tokens=20
                 )
@@ -771,7 +815,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
                 words = clean_desc.split()[:4]
                 name = " ".join(words)
 
-            task_id = self.task_manager.create_task(user_id, name, description)
+            task_id = await self.task_manager.acreate_task(user_id, name, description)
 
             await update.message.reply_text(
                 f"Task erstellt!\n\n"
@@ -781,7 +825,9 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
 
         # LIST
         elif subcommand == "list":
-            tasks = self.task_manager.list_tasks(user_id, status="all")
+            tasks = await self.task_manager.alist_tasks(
+                user_id, status="all", fields=("id", "description", "status")
+            )
 
             if not tasks:
                 await update.message.reply_text("Du hast noch keine Tasks erstellt.")
@@ -810,7 +856,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
                 return
 
             task_id = context.args[1]
-            task = self.task_manager.get_task(user_id, task_id)
+            task = await self.task_manager.aget_task(user_id, task_id)
 
             if not task:
                 await update.message.reply_text(f"Task {task_id} nicht gefunden.")
@@ -858,7 +904,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
                 "Dies kann einen Moment dauern. Das LLM generiert ein Python-Skript und führt es aus."
             )
 
-            success, result = self.task_manager.run_task(user_id, task_id, self.llm_client, user_input)
+            success, result = await self.task_manager.arun_task(user_id, task_id, self.llm_client, user_input)
 
             if success:
                 # Ergebnis kürzen falls nötig
@@ -883,7 +929,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
 
             task_id = context.args[1]
 
-            if self.task_manager.delete_task(user_id, task_id):
+            if await self.task_manager.adelete_task(user_id, task_id):
                 await update.message.reply_text(f"Task {task_id} wurde gelöscht.")
             else:
                 await update.message.reply_text(f"Task {task_id} nicht gefunden.")
@@ -894,6 +940,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
                 "Verfügbare Befehle: create, list, show, run, delete"
             )
 
+    @serialize_per_user
     async def skill_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für den /skill Befehl.
@@ -1003,7 +1050,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
             await update.message.chat.send_action("typing")
             await update.message.reply_text(f"Führe Skill {skill_name} aus...")
 
-            success, result = self.skill_manager.run_skill(user_id, skill_name, args)
+            success, result = await self.skill_manager.arun_skill(user_id, skill_name, args)
 
             if success:
                 # Ergebnis kürzen falls nötig
@@ -1039,6 +1086,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
                 "Verfügbare Befehle: save, list, show, run, delete"
             )
 
+    @serialize_per_user
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handler für Textnachrichten.
@@ -1062,10 +1110,10 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
         await update.message.chat.send_action("typing")
 
         # Benutzer-Nachricht speichern
-        self.memory_manager.append_message(user_id, "user", user_message)
+        await self.memory_manager.aappend_message(user_id, "user", user_message)
 
         # Konversations-Kontext laden
-        conversation_history = self.memory_manager.get_context(user_id, max_messages=10)
+        conversation_history = await self.memory_manager.aget_context(user_id, max_messages=10)
 
         # Important-Dateien laden (importierte Webseiten, Präferenzen)
         important_context = self._load_important_files(user_id)
@@ -1076,7 +1124,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
             enhanced_user_message = f"[Wichtiger Kontext aus deinem Gedächtnis:]\n{important_context}\n\n[Benutzer-Anfrage:]\n{user_message}"
 
         # Anfrage an das LLM senden mit Intention-basierter Tool-Nutzung
-        response = self.llm_client.chat_with_intention(
+        response = await self.llm_client.achat_with_intention(
             user_message=enhanced_user_message,
             conversation_history=conversation_history,
             max_tokens=2000
@@ -1093,7 +1141,7 @@ Generiere jetzt den Task-Namen. Antworte NUR mit dem Snake-Case Namen (z.B. "cal
                 response = response[:TELEGRAM_LIMIT] + "\n\n...(Antwort wegen Länge gekürzt)"
 
             # Antwort speichern
-            self.memory_manager.append_message(user_id, "assistant", response)
+            await self.memory_manager.aappend_message(user_id, "assistant", response)
 
             # Antwort senden
             await update.message.reply_text(response)
@@ -20,6 +20,33 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def atomic_write_text(path: Path, data: str):
+    """
+    Schreibt eine Textdatei atomar.
+
+    Der Inhalt wird zuerst in eine temporäre Datei im selben Verzeichnis
+    geschrieben und dann per os.replace an die Zielposition verschoben.
+    Ein Abbruch während des Schreibens hinterlässt so nie eine halb
+    geschriebene Zieldatei.
+
+    Args:
+        path: Zieldatei
+        data: Zu schreibender Text (UTF-8)
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        # Einmal komplett kodieren: der gepufferte Binär-Writer reicht
+        # Blöcke über Puffergröße direkt in einem write() durch
+        tmp_path.write_bytes(data.encode("utf-8"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
 class FileStructureManager:
     """Verwaltet die Memory 2.0 Ordnerstruktur."""
 
@@ -190,35 +217,44 @@ class FileStructureManager:
         """
         daily_dir = self.get_user_dir(user_id) / "daily"
 
-        if not daily_dir.exists():
-            return []
+        # Dateinamen YYYYMMDD.md sortieren als String chronologisch, daher
+        # genügt ein Namensvergleich (kein strptime/stat pro Datei)
+        start_key = None
+        end_key = None
+        if start_date:
+            # Tagesdatei zählt ab 00:00 Uhr, also erst ab dem Folgetag wenn
+            # start_date eine Uhrzeit trägt
+            first_day = start_date.date()
+            if start_date.time() != datetime.min.time():
+                first_day += timedelta(days=1)
+            start_key = first_day.strftime("%Y%m%d")
+        if end_date:
+            end_key = end_date.strftime("%Y%m%d")
 
-        # Alle .md Dateien im daily Ordner
-        files = list(daily_dir.glob("*.md"))
+        try:
+            with os.scandir(daily_dir) as entries:
+                names = [entry.name for entry in entries if entry.name.endswith(".md")]
+        except FileNotFoundError:
+            return []
 
         # Filtern nach Datum wenn angegeben
-        if start_date or end_date:
-            filtered_files = []
-            for file in files:
-                try:
-                    # Parse Datum aus Dateiname YYYYMMDD.md
-                    file_date = datetime.strptime(file.stem, "%Y%m%d")
-
-                    if start_date and file_date < start_date:
-                        continue
-                    if end_date and file_date > end_date:
-                        continue
-
-                    filtered_files.append(file)
-                except ValueError:
-                    logger.warning(f"Ungültiger Dateiname: {file.name}")
+        if start_key or end_key:
+            filtered_names = []
+            for name in names:
+                key = name[:-3]
+                if len(key) != 8 or not key.isdigit():
+                    logger.warning(f"Ungültiger Dateiname: {name}")
                     continue
-
-            files = filtered_files
+                if start_key and key < start_key:
+                    continue
+                if end_key and key > end_key:
+                    continue
+                filtered_names.append(name)
+            names = filtered_names
 
         # Sortiere nach Datum (neueste zuerst)
-        files.sort(reverse=True)
-        return files
+        names.sort(reverse=True)
+        return [daily_dir / name for name in names]
 
     def archive_file(self, source_path: Path, user_id: int,
                     file_type: str = "daily") -> Optional[Path]:
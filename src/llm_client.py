@@ -6,7 +6,10 @@ Unterstützt Intention-basierte Tool-Nutzung.
 """
 
 import os
+import re
 import json
+import asyncio
+import inspect
 import requests
 from typing import List, Dict, Optional, Callable, Any
 from dotenv import load_dotenv
@@ -14,10 +17,52 @@ from dotenv import load_dotenv
 # Lade Umgebungsvariablen
 load_dotenv()
 
+# Beginn eines JSON-Arrays von Tool-Aufrufen ("[{" oder "[]"), Fließtext wie "[Hinweis]" passt nicht
+_JSON_ARRAY_START = re.compile(r"\[\s*[{\]]")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json_array(content: str) -> Optional[list]:
+    """
+    Extrahiert das erste gültige JSON-Array aus einer LLM-Antwort.
+
+    Text vor oder nach dem Array sowie weitere Arrays werden ignoriert.
+
+    Args:
+        content: Antworttext des Modells
+
+    Returns:
+        Das geparste Array oder None wenn keines gefunden wurde
+    """
+    for match in _JSON_ARRAY_START.finditer(content):
+        try:
+            value, _ = _JSON_DECODER.raw_decode(content, match.start())
+        except ValueError:
+            continue
+        if isinstance(value, list):
+            return value
+    return None
+
 
 class LLMClient:
     """Client für die Kommunikation mit GLM-4.7 via Proxy."""
 
+    # Statischer Teil des Intention-Prompts nach der Benutzeranfrage
+    INTENTION_PROMPT_SUFFIX = """
+
+Gib deine Antwort ausschließlich als gültiges JSON-Array zurück. Jedes Objekt im Array muss folgende Struktur haben:
+{"tool": "tool_name", "parameters": {"param": "value"}}
+
+Wenn kein Tool benötigt wird, gib ein leeres Array zurück: []
+
+Beispiele:
+- "Wie ist das Wetter?" -> [{"tool": "web_search", "parameters": {"query": "aktuelles Wetter"}}]
+- "Erzähl mir einen Witz" -> []
+- "Was gibt es Neues?" -> [{"tool": "web_search", "parameters": {"query": "aktuelle Nachrichten"}}]
+- "Suche nach Informationen über Python" -> [{"tool": "web_search", "parameters": {"query": "Python Programmierung"}}]
+
+Deine Antwort (nur JSON):"""
+
     def __init__(
         self,
         proxy_url: str = "https://glmproxy.ccpn.cc/v1/messages",
@@ -36,9 +81,16 @@ class LLMClient:
         # Tool-Registry (wird von außen registriert)
         self.tools: Dict[str, Callable] = {}
 
+        # Signaturen der Tools zur Prüfung der Parameter vor dem Aufruf
+        self._tool_signatures: Dict[str, inspect.Signature] = {}
+
         # Tool-Beschreibungen für Intention-Erkennung
         self.tool_descriptions: List[Dict[str, str]] = []
 
+        # Vorgerenderter Intention-Prompt bis zur Benutzeranfrage
+        # (wird bei jeder Tool-Registrierung neu aufgebaut)
+        self._intention_prompt_prefix = ""
+
         # System-Prompt für Crowdbot
         self.system_prompt = """Du bist Crowdbot, ein hilfreicher und freundlicher KI-Assistent mit dauerhaftem Gedächtnis.
 
@@ -115,51 +167,47 @@ WICHTIG für deine Antworten:
             parameters: Beschreibung der Parameter (optional)
         """
         self.tools[name] = func
+        self._tool_signatures[name] = inspect.signature(func)
         self.tool_descriptions.append({
             "name": name,
             "description": description,
             "parameters": parameters or {}
         })
+        self._intention_prompt_prefix = self._render_intention_prompt_prefix()
         print(f"Tool '{name}' registriert: {description}")
 
-    def _analyze_intention(self, user_message: str) -> List[Dict[str, Any]]:
+    def _render_intention_prompt_prefix(self) -> str:
         """
-        Analysiert die Intention des Benutzers und entscheidet welche Tools genutzt werden.
-
-        Args:
-            user_message: Die Nachricht des Benutzers
+        Rendert den Intention-Prompt mit der Tool-Liste bis zur Benutzeranfrage.
 
         Returns:
-            Liste der Tool-Aufrufe mit Parametern
+            Prompt-Präfix, an das nur noch die Benutzeranfrage angehängt wird
         """
-        if not self.tool_descriptions:
-            return []
-
-        # Baue Tool-Liste für den Prompt auf
         tools_list = "\n".join([
             f"- {tool['name']}: {tool['description']}"
             for tool in self.tool_descriptions
         ])
 
-        intention_prompt = f"""Analysiere die folgende Benutzeranfrage und entscheide, welche Tools genutzt werden sollen.
-
-Verfügbare Tools:
-{tools_list}
+        return (
+            "Analysiere die folgende Benutzeranfrage und entscheide, welche Tools genutzt werden sollen.\n\n"
+            f"Verfügbare Tools:\n{tools_list}\n\n"
+            "Benutzeranfrage: "
+        )
 
-Benutzeranfrage: {user_message}
-
-Gib deine Antwort ausschließlich als gültiges JSON-Array zurück. Jedes Objekt im Array muss folgende Struktur haben:
-{{"tool": "tool_name", "parameters": {{"param": "value"}}}}
+    def _analyze_intention(self, user_message: str) -> List[Dict[str, Any]]:
+        """
+        Analysiert die Intention des Benutzers und entscheidet welche Tools genutzt werden.
 
-Wenn kein Tool benötigt wird, gib ein leeres Array zurück: []
+        Args:
+            user_message: Die Nachricht des Benutzers
 
-Beispiele:
-- "Wie ist das Wetter?" -> [{{"tool": "web_search", "parameters": {{"query": "aktuelles Wetter"}}}}]
-- "Erzähl mir einen Witz" -> []
-- "Was gibt es Neues?" -> [{{"tool": "web_search", "parameters": {{"query": "aktuelle Nachrichten"}}}}]
-- "Suche nach Informationen über Python" -> [{{"tool": "web_search", "parameters": {{"query": "Python Programmierung"}}}}]
+        Returns:
+            Liste der Tool-Aufrufe mit Parametern
+        """
+        if not self.tool_descriptions:
+            return []
 
-Deine Antwort (nur JSON):"""
+        intention_prompt = self._intention_prompt_prefix + user_message + self.INTENTION_PROMPT_SUFFIX
 
         try:
             payload = {
@@ -189,13 +237,10 @@ Deine Antwort (nur JSON):"""
                 content = data["content"][0].get("text", "")
 
                 # JSON aus dem Content extrahieren
-                # Manchmal gibt der Bot Text vor dem JSON zurück
-                json_start = content.find("[")
-                json_end = content.rfind("]") + 1
+                # Manchmal gibt der Bot Text vor oder nach dem JSON zurück
+                tool_calls = _extract_json_array(content)
 
-                if json_start >= 0 and json_end > json_start:
-                    json_str = content[json_start:json_end]
-                    tool_calls = json.loads(json_str)
+                if tool_calls is not None:
                     print(f"Intention erkannt: {tool_calls}")
                     return tool_calls
 
@@ -219,6 +264,17 @@ Deine Antwort (nur JSON):"""
         if tool_name not in self.tools:
             return f"Fehler: Tool '{tool_name}' nicht gefunden"
 
+        # Parameter prüfen bevor das Tool ausgeführt wird
+        if not isinstance(tool_input, dict):
+            return f"Fehler: Ungültige Parameter für {tool_name}: Objekt erwartet"
+
+        signature = self._tool_signatures.get(tool_name)
+        if signature is not None:
+            try:
+                signature.bind(**tool_input)
+            except TypeError as e:
+                return f"Fehler: Ungültige Parameter für {tool_name}: {e}"
+
         try:
             func = self.tools[tool_name]
             result = func(**tool_input)
@@ -387,6 +443,54 @@ Deine Antwort (nur JSON):"""
             print(f"Unerwarteter Fehler: {e}")
             return None
 
+    async def achat(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        max_tokens: int = 1000
+    ) -> Optional[str]:
+        """
+        Asynchrone Variante von chat().
+
+        Der blockierende HTTP-Aufruf läuft in einem Worker-Thread, damit der
+        Event-Loop währenddessen Anfragen anderer Benutzer bearbeiten kann.
+
+        Args:
+            user_message: Die Nachricht des Benutzers
+            conversation_history: Optionaler Konversationsverlauf
+            max_tokens: Maximale Anzahl der Tokens in der Antwort
+
+        Returns:
+            Die Antwort des Modells oder None bei Fehler
+        """
+        return await asyncio.to_thread(
+            self.chat, user_message, conversation_history, max_tokens
+        )
+
+    async def achat_with_intention(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        max_tokens: int = 2000
+    ) -> Optional[str]:
+        """
+        Asynchrone Variante von chat_with_intention().
+
+        Intention-Analyse, Tool-Aufrufe und finale Anfrage laufen gemeinsam
+        in einem Worker-Thread.
+
+        Args:
+            user_message: Die Nachricht des Benutzers
+            conversation_history: Optionaler Konversationsverlauf
+            max_tokens: Maximale Anzahl der Tokens in der Antwort
+
+        Returns:
+            Die Antwort des Modells oder None bei Fehler
+        """
+        return await asyncio.to_thread(
+            self.chat_with_intention, user_message, conversation_history, max_tokens
+        )
+
     def test_connection(self) -> bool:
         """
         Testet die Verbindung zum GLM-Proxy.
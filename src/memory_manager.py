@@ -5,15 +5,34 @@ Verwaltet das Konversationsgedächtnis pro User in Markdown-Dateien.
 Jede Unterhaltung wird in /data/users/{user_id}/memory.md gespeichert.
 """
 
-import os
+import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+# Role-Header im Markdown-Format
+_USER_HEADER = "### Benutzer - "
+_ASSISTANT_HEADER = "### Crowdbot - "
+_ROLE_HEADERS = {_USER_HEADER: "user", _ASSISTANT_HEADER: "assistant"}
+
+# Ganze Header-Zeile, Gruppe 1 ist der Role-Prefix
+_ROLE_HEADER_PATTERN = re.compile(
+    "^(" + re.escape(_USER_HEADER) + "|" + re.escape(_ASSISTANT_HEADER) + ")[^\n]*$",
+    re.MULTILINE
+)
+
+# Zeilen mit diesen Präfixen gehören nicht zum Nachrichteninhalt
+_SKIP_PREFIXES = ("---", "#")
 
 
 class MemoryManager:
     """Verwaltet das Gedächtnis für Crowdbot-Benutzer."""
 
+    # Maximale Anzahl gecachter Konversationsverläufe (LRU)
+    CONTEXT_CACHE_SIZE = 256
+
     def __init__(self, data_dir: str = "/media/xray/NEU/Code/Crowdbot/data"):
         """
         Initialisiert den Memory Manager.
@@ -25,6 +44,12 @@ class MemoryManager:
         self.users_dir = self.data_dir / "users"
         self.users_dir.mkdir(parents=True, exist_ok=True)
 
+        # LRU-Cache: user_id -> (st_mtime_ns, st_size, geparste Nachrichten)
+        self._ctx_cache: "OrderedDict[int, Tuple[int, int, List[Dict[str, str]]]]" = OrderedDict()
+
+        # Schreib-Lock pro Benutzer: genau ein Schreiber pro memory.md
+        self._locks: Dict[int, threading.Lock] = {}
+
     def _get_memory_path(self, user_id: int) -> Path:
         """
         Gibt den Pfad zur Memory-Datei eines Benutzers zurück.
@@ -39,6 +64,10 @@ class MemoryManager:
         user_dir.mkdir(parents=True, exist_ok=True)
         return user_dir / "memory.md"
 
+    def _get_lock(self, user_id: int) -> threading.Lock:
+        """Gibt den Schreib-Lock eines Benutzers zurück (wird bei Bedarf angelegt)."""
+        return self._locks.setdefault(user_id, threading.Lock())
+
     def create_user(self, user_id: int, username: str = None) -> bool:
         """
         Erstellt einen neuen Benutzer mit Memory-Datei.
@@ -52,13 +81,14 @@ class MemoryManager:
         """
         memory_path = self._get_memory_path(user_id)
 
-        if memory_path.exists():
-            return False
+        with self._get_lock(user_id):
+            if memory_path.exists():
+                return False
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        display_name = username or f"User_{user_id}"
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            display_name = username or f"User_{user_id}"
 
-        initial_content = f"""# Crowdbot Gedächtnis für {display_name}
+            initial_content = f"""# Crowdbot Gedächtnis für {display_name}
 
 Erstellt: {timestamp}
 
@@ -68,7 +98,8 @@ Erstellt: {timestamp}
 
 """
 
-        memory_path.write_text(initial_content, encoding="utf-8")
+            memory_path.write_text(initial_content, encoding="utf-8")
+
         return True
 
     def reset_user(self, user_id: int, username: str = None) -> bool:
@@ -97,7 +128,9 @@ Zurückgesetzt: {timestamp}
 
 """
 
-        memory_path.write_text(reset_content, encoding="utf-8")
+        with self._get_lock(user_id):
+            memory_path.write_text(reset_content, encoding="utf-8")
+            self._ctx_cache.pop(user_id, None)
         return True
 
     def append_message(self, user_id: int, role: str, content: str) -> bool:
@@ -120,12 +153,12 @@ Zurückgesetzt: {timestamp}
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # Role-Name bestimmen
-        role_name = "Benutzer" if role == "user" else "Crowdbot"
+        # Role-Header bestimmen
+        header = _USER_HEADER if role == "user" else _ASSISTANT_HEADER
 
         # Markdown-Format für die Nachricht
         message_entry = f"""
-### {role_name} - {timestamp}
+{header}{timestamp}
 
 {content}
 
@@ -134,9 +167,11 @@ Zurückgesetzt: {timestamp}
 """
 
         # An Datei anhängen
-        with open(memory_path, "a", encoding="utf-8") as f:
-            f.write(message_entry)
+        with self._get_lock(user_id):
+            with open(memory_path, "a", encoding="utf-8") as f:
+                f.write(message_entry)
 
+        self._ctx_cache.pop(user_id, None)
         return True
 
     def get_context(self, user_id: int, max_messages: int = 10) -> List[Dict[str, str]]:
@@ -155,45 +190,76 @@ Zurückgesetzt: {timestamp}
         if not memory_path.exists():
             return []
 
-        content = memory_path.read_text(encoding="utf-8")
-
-        # Extrahiere Nachrichten aus dem Markdown-Format
-        messages = []
-        current_role = None
-        current_content = []
-
-        for line in content.split("\n"):
-            # Erkenne Role-Header
-            if line.startswith("### Benutzer - "):
-                if current_role and current_content:
-                    messages.append({
-                        "role": current_role,
-                        "content": "\n".join(current_content).strip()
-                    })
-                current_role = "user"
-                current_content = []
-            elif line.startswith("### Crowdbot - "):
-                if current_role and current_content:
-                    messages.append({
-                        "role": current_role,
-                        "content": "\n".join(current_content).strip()
-                    })
-                current_role = "assistant"
-                current_content = []
-            # Überspringe Trennlinien und leere Zeilen
-            elif line.strip() and not line.startswith("---") and not line.startswith("#"):
-                current_content.append(line)
-
-        # Letzte Nachricht hinzufügen
-        if current_role and current_content:
-            messages.append({
-                "role": current_role,
-                "content": "\n".join(current_content).strip()
-            })
+        messages = self._load_messages(user_id, memory_path)
 
         # Gib nur die letzten max_messages zurück
         return messages[-max_messages:]
 
+    def _load_messages(self, user_id: int, memory_path: Path) -> List[Dict[str, str]]:
+        """
+        Lädt alle Nachrichten eines Benutzers, bevorzugt aus dem LRU-Cache.
+
+        Der Cache-Eintrag ist gültig solange mtime und Größe der Datei
+        unverändert sind; dann entfällt jegliches Lesen und Parsen.
+
+        Args:
+            user_id: Telegram Benutzer-ID
+            memory_path: Pfad zur memory.md Datei
+
+        Returns:
+            Liste aller Nachrichten in chronologischer Reihenfolge
+        """
+        st = memory_path.stat()
+        cached = self._ctx_cache.get(user_id)
+
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            self._ctx_cache.move_to_end(user_id)
+            return cached[2]
+
+        messages = self._parse_messages(memory_path.read_text(encoding="utf-8"))
+
+        self._ctx_cache[user_id] = (st.st_mtime_ns, st.st_size, messages)
+        self._ctx_cache.move_to_end(user_id)
+        if len(self._ctx_cache) > self.CONTEXT_CACHE_SIZE:
+            self._ctx_cache.popitem(last=False)
+
+        return messages
+
+    def _parse_messages(self, content: str) -> List[Dict[str, str]]:
+        """
+        Extrahiert Nachrichten aus dem Markdown-Format.
+
+        Die Role-Header werden in einem Durchlauf mit einem vorkompilierten
+        Regex gefunden (Suche läuft in C); nur die Zeilen innerhalb der
+        Nachrichten werden noch in Python gefiltert.
+
+        Args:
+            content: Inhalt der memory.md Datei
+
+        Returns:
+            Liste von Dictionaries mit {"role": ..., "content": ...}
+        """
+        messages = []
+        headers = list(_ROLE_HEADER_PATTERN.finditer(content))
+
+        for i, header in enumerate(headers):
+            body_end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+            body = content[header.end():body_end]
+
+            # Überspringe Trennlinien, Header und leere Zeilen
+            lines = [
+                line for line in body.split("\n")
+                if line.strip() and not line.startswith(_SKIP_PREFIXES)
+            ]
+
+            if lines:
+                messages.append({
+                    "role": _ROLE_HEADERS[header.group(1)],
+                    "content": "\n".join(lines).strip()
+                })
+
+        return messages
+
     def user_exists(self, user_id: int) -> bool:
         """
         Prüft, ob ein Benutzer bereits existiert.
@@ -221,12 +287,11 @@ Zurückgesetzt: {timestamp}
         if not memory_path.exists():
             return {"exists": False}
 
-        content = memory_path.read_text(encoding="utf-8")
-        messages = self.get_context(user_id, max_messages=1000)
+        messages = self._load_messages(user_id, memory_path)
 
         return {
             "exists": True,
             "total_messages": len(messages),
-            "file_size_bytes": len(content.encode("utf-8")),
+            "file_size_bytes": memory_path.stat().st_size,
             "path": str(memory_path)
         }
@@ -9,15 +9,39 @@ Erweiterte Version mit hierarchischem Gedächtnissystem:
 """
 
 import os
+import re
+import asyncio
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 
 from .file_structure import FileStructureManager
 
 logger = logging.getLogger(__name__)
 
+# Role-Header im Markdown-Format
+_USER_HEADER = "### Benutzer - "
+_ASSISTANT_HEADER = "### Crowdbot - "
+_ROLE_HEADERS = {_USER_HEADER: "user", _ASSISTANT_HEADER: "assistant"}
+
+# Ganze Header-Zeile, Gruppe 1 ist der Role-Prefix
+_ROLE_HEADER_PATTERN = re.compile(
+    "^(" + re.escape(_USER_HEADER) + "|" + re.escape(_ASSISTANT_HEADER) + ")[^\n]*$",
+    re.MULTILINE
+)
+
+# Zeilen mit diesen Präfixen gehören nicht zum Nachrichteninhalt
+_SKIP_PREFIXES = ("---", "#")
+
+# V1-Header "### <Rolle> - <Datum> ...": Gruppe 1 ist das erste Wort nach dem
+# ersten " - " (das Datum)
+_V1_HEADER_PATTERN = re.compile(
+    r"^### (?:(?! - )[^\n])* - [^\S\n]*(\S+)[^\n]*$",
+    re.MULTILINE
+)
 
 class MemoryManagerV2:
     """
@@ -26,6 +50,15 @@ class MemoryManagerV2:
     Kompatibel mit V1 API, nutzt aber intern die neue Struktur.
     """
 
+    # Maximale Anzahl gleichzeitig offen gehaltener Tagesdateien
+    MAX_OPEN_WRITERS = 64
+
+    # Anzahl gecachter Parse-Ergebnisse von Tagesdateien
+    PARSE_CACHE_SIZE = 512
+
+    # Bytes, die für get_context vom Ende einer Tagesdatei gelesen werden
+    CONTEXT_TAIL_BYTES = 64 * 1024
+
     def __init__(self, data_dir: str = "/media/xray/NEU/Code/Crowdbot/data"):
         """
         Initialisiert den Memory Manager V2.
@@ -40,6 +73,24 @@ class MemoryManagerV2:
         # Stelle sicher, dass Basisverzeichnis existiert
         self.users_dir.mkdir(parents=True, exist_ok=True)
 
+        self._write_lock = threading.RLock()
+
+        # Offene Append-Deskriptoren (LRU): user_id -> (Tagesdatei, fd)
+        self._writers: "OrderedDict[int, Tuple[Path, int]]" = OrderedDict()
+
+        # Ergebnis von user_exists pro User: user_id -> (Verzeichnis-Schlüssel, exists).
+        # Gültig solange sich das User-Verzeichnis nicht ändert (auch durch
+        # andere Prozesse, z.B. Migration, CleanupService oder /reset)
+        self._exists_cache: Dict[int, Tuple[Tuple[int, int], bool]] = {}
+
+        # Zuletzt genutzte Tagesdatei pro User, deren Existenz bereits geprüft ist:
+        # user_id -> (Tagesdatei, Schlüssel des daily/-Verzeichnisses)
+        self._known_daily_files: Dict[int, Tuple[Path, Optional[Tuple[int, int]]]] = {}
+
+        # LRU-Cache geparster Tagesdateien: path -> (mtime_ns, size, messages)
+        self._parse_cache: "OrderedDict[Path, Tuple[int, int, List[Dict[str, str]]]]" = OrderedDict()
+        self._parse_lock = threading.Lock()
+
     def create_user(self, user_id: int, username: str = None) -> bool:
         """
         Erstellt einen neuen Benutzer mit Memory 2.0 Struktur.
@@ -59,8 +110,11 @@ class MemoryManagerV2:
         # Erstelle V2 Ordnerstruktur
         self.file_structure.ensure_v2_structure(user_id)
 
+        # Ein Zeitpunkt für Index und erste Tagesdatei
+        now = datetime.now()
+
         # Erstelle Master Index (memory.md)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
         display_name = username or f"User {user_id}"
 
         memory_index = f"""# Crowdbot Langzeitgedächtnis für {display_name}
@@ -82,7 +136,7 @@ Letzte Aktualisierung: {timestamp}
 
 ## Konversationshistorie (Chronologisch, neueste zuerst)
 
-### {datetime.now().strftime("%Y-%m-%d")} (Heute) - [Details](daily/{datetime.now().strftime("%Y%m%d")}.md)
+### {now.strftime("%Y-%m-%d")} (Heute) - [Details](daily/{now.strftime("%Y%m%d")}.md)
 
 **Themen:** Erste Konversation
 **Wichtigkeit:** -
@@ -101,20 +155,9 @@ Letzte Aktualisierung: {timestamp}
         memory_path.write_text(memory_index, encoding="utf-8")
 
         # Erstelle erste Tagesdatei
-        today = datetime.now()
-        daily_path = self.file_structure.get_daily_file_path(user_id, today)
+        daily_path = self.file_structure.get_daily_file_path(user_id, now)
 
-        daily_content = f"""# Tagesdatei {today.strftime("%d.%m.%Y")}
-
-Erstellt: {timestamp}
-
----
-
-## Gespräche
-
-"""
-
-        daily_path.write_text(daily_content, encoding="utf-8")
+        daily_path.write_text(self._daily_file_header(now, timestamp), encoding="utf-8")
 
         # Erstelle leere preferences.md
         prefs_path = self.file_structure.get_preferences_path(user_id)
@@ -135,6 +178,12 @@ Erstellt: {timestamp}
 """
         prefs_path.write_text(prefs_content, encoding="utf-8")
 
+        # Ein noch offener Deskriptor gehört zu einer früheren (gelöschten) Datei
+        with self._write_lock:
+            self._close_writer(user_id)
+            self._exists_cache.pop(user_id, None)
+            self._known_daily_files[user_id] = (daily_path, self._dir_key(daily_path.parent))
+
         logger.info(f"User {user_id} erfolgreich mit Memory V2 erstellt")
         return True
 
@@ -149,21 +198,25 @@ Erstellt: {timestamp}
         Returns:
             True wenn erfolgreich
         """
-        import shutil
-
         user_dir = self.file_structure.get_user_dir(user_id)
 
         if not user_dir.exists():
             logger.warning(f"User {user_id} existiert nicht, kann nicht zurückgesetzt werden")
             return False
 
-        # Backup erstellen
+        with self._write_lock:
+            self._close_writer(user_id)
+
+        # Backup erstellen: User-Verzeichnis umbenennen statt kopieren und löschen
         backup_dir = user_dir.parent / f"{user_id}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        shutil.copytree(user_dir, backup_dir)
+        os.replace(user_dir, backup_dir)
         logger.info(f"Backup erstellt: {backup_dir}")
 
-        # User-Verzeichnis löschen
-        shutil.rmtree(user_dir)
+        self._exists_cache.pop(user_id, None)
+        self._known_daily_files.pop(user_id, None)
+        with self._parse_lock:
+            for path in [path for path in self._parse_cache if user_dir in path.parents]:
+                del self._parse_cache[path]
 
         # Neu erstellen
         return self.create_user(user_id, username)
@@ -186,15 +239,11 @@ Erstellt: {timestamp}
         if not self.user_exists(user_id):
             self.create_user(user_id)
 
-        # Hole Pfad zur heutigen Tagesdatei
-        today = datetime.now()
-        daily_path = self.file_structure.get_daily_file_path(user_id, today)
+        # Hole Pfad zur heutigen Tagesdatei (Datei und Zeitstempel vom selben Zeitpunkt)
+        now = datetime.now()
+        daily_path = self.file_structure.get_daily_file_path(user_id, now)
 
-        # Erstelle Tagesdatei wenn sie noch nicht existiert
-        if not daily_path.exists():
-            self._create_daily_file(user_id, today)
-
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
         role_name = "Benutzer" if role == "user" else "Crowdbot"
 
         # Markdown-Format für die Nachricht
@@ -207,16 +256,38 @@ Erstellt: {timestamp}
 
 """
 
-        # An Tagesdatei anhängen
-        with open(daily_path, "a", encoding="utf-8") as f:
-            f.write(message_entry)
+        # An Tagesdatei anhängen (sofort, über den offen gehaltenen Deskriptor)
+        data = memoryview(message_entry.encode("utf-8"))
+        with self._write_lock:
+            # Erstelle Tagesdatei wenn sie noch nicht existiert. Geprüft wird nur
+            # erneut, wenn sich der Tag oder das daily/-Verzeichnis geändert hat;
+            # dann kann auch der offene Deskriptor auf eine gelöschte Datei zeigen
+            daily_dir_key = self._dir_key(daily_path.parent)
+            if self._known_daily_files.get(user_id) != (daily_path, daily_dir_key):
+                self._close_writer(user_id)
+                if daily_dir_key is None:
+                    self.file_structure.ensure_v2_structure(user_id)
+                if not daily_path.exists():
+                    self._create_daily_file(user_id, now)
+                self._known_daily_files[user_id] = (daily_path, self._dir_key(daily_path.parent))
 
-        # Aktualisiere memory.md Timestamp
-        self._update_memory_index_timestamp(user_id)
+            try:
+                fd = self._get_writer(user_id, daily_path)
+                while data:
+                    data = data[os.write(fd, data):]
+            except OSError:
+                self._close_writer(user_id)
+                raise
 
         logger.debug(f"Nachricht hinzugefügt für User {user_id} in {daily_path.name}")
         return True
 
+    def close(self):
+        """Schließt alle offenen Datei-Handles."""
+        with self._write_lock:
+            for user_id in list(self._writers):
+                self._close_writer(user_id)
+
     def get_context(self, user_id: int, max_messages: int = 10) -> List[Dict[str, str]]:
         """
         Lädt die letzten Nachrichten aus dem Gedächtnis.
@@ -233,7 +304,8 @@ Erstellt: {timestamp}
         if not self.user_exists(user_id):
             return []
 
-        messages = []
+        if max_messages <= 0:
+            return []
 
         # Lade Tagesdateien der letzten 7 Tage
         end_date = datetime.now()
@@ -245,18 +317,28 @@ Erstellt: {timestamp}
             end_date=end_date
         )
 
-        # Lese Dateien (neueste zuerst)
+        # Lese Dateien (neueste zuerst), jede Datei ist in sich chronologisch
+        chunks = []
+        remaining = max_messages
         for daily_file in daily_files:
-            file_messages = self._parse_daily_file(daily_file)
-            messages.extend(file_messages)
+            file_messages = self._parse_daily_file(
+                daily_file,
+                max_messages=remaining,
+                tail_bytes=self.CONTEXT_TAIL_BYTES
+            )
+            if file_messages:
+                chunks.append(file_messages)
+                remaining -= len(file_messages)
 
             # Stoppe wenn genug Nachrichten gesammelt
-            if len(messages) >= max_messages:
+            if remaining <= 0:
                 break
 
-        # Umkehren (chronologisch) und auf max_messages begrenzen
-        messages.reverse()
-        return messages[-max_messages:]
+        # Älteste Tagesdatei zuerst zusammensetzen (chronologisch)
+        messages = []
+        for chunk in reversed(chunks):
+            messages.extend(chunk)
+        return messages
 
     def user_exists(self, user_id: int) -> bool:
         """
@@ -268,15 +350,48 @@ Erstellt: {timestamp}
         Returns:
             True wenn Benutzer existiert (V1 oder V2)
         """
-        user_dir = self.file_structure.get_user_dir(user_id)
-
-        if not user_dir.exists():
+        user_dir_key = self._dir_key(self.file_structure.get_user_dir(user_id))
+        if user_dir_key is None:
+            self._exists_cache.pop(user_id, None)
             return False
 
+        cached = self._exists_cache.get(user_id)
+        if cached is not None and cached[0] == user_dir_key:
+            return cached[1]
+
         # Prüfe auf V2 Struktur (memory.md existiert)
         memory_path = self.file_structure.get_memory_index_path(user_id)
+        exists = memory_path.exists()
+
+        self._exists_cache[user_id] = (user_dir_key, exists)
+        return exists
 
-        return memory_path.exists()
+    def get_last_updated(self, user_id: int) -> Optional[datetime]:
+        """
+        Gibt den Zeitpunkt der letzten Aktualisierung des Gedächtnisses zurück.
+
+        Wird aus der mtime der neuesten Tagesdatei gelesen (Fallback: memory.md),
+        statt bei jeder Nachricht einen Zeitstempel in memory.md zu schreiben.
+
+        Args:
+            user_id: Telegram Benutzer-ID
+
+        Returns:
+            Zeitpunkt der letzten Änderung oder None wenn der User nicht existiert
+        """
+        if not self.user_exists(user_id):
+            return None
+
+        candidates = self.file_structure.list_daily_files(user_id)[:1]
+        candidates.append(self.file_structure.get_memory_index_path(user_id))
+
+        for path in candidates:
+            try:
+                return datetime.fromtimestamp(path.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+
+        return None
 
     def get_memory_stats(self, user_id: int) -> Dict[str, any]:
         """
@@ -298,6 +413,10 @@ Erstellt: {timestamp}
         messages = self.get_context(user_id, max_messages=1000)
         stats["total_messages"] = len(messages)
 
+        # Letzte Aktualisierung aus der mtime der Tagesdateien
+        last_updated = self.get_last_updated(user_id)
+        stats["last_updated"] = last_updated.strftime("%Y-%m-%d %H:%M:%S") if last_updated else None
+
         # Füge Pfad hinzu
         stats["memory_index_path"] = str(self.file_structure.get_memory_index_path(user_id))
 
@@ -347,19 +466,23 @@ Erstellt: {timestamp}
         # Parse Nachrichten mit Timestamps
         messages_by_date = self._parse_v1_memory(content)
 
-        # Erstelle Tagesdateien
+        # Erstelle Tagesdateien (ein Schreibvorgang pro Tag)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         for date_str, messages in messages_by_date.items():
             try:
                 date = datetime.strptime(date_str, "%Y-%m-%d")
                 daily_path = self.file_structure.get_daily_file_path(user_id, date)
 
-                # Erstelle Tagesdatei
-                self._create_daily_file(user_id, date)
+                body = "".join(msg + "\n\n---\n\n" for msg in messages)
 
-                # Füge Nachrichten hinzu
-                with open(daily_path, "a", encoding="utf-8") as f:
-                    for msg in messages:
-                        f.write(msg + "\n\n---\n\n")
+                if daily_path.exists():
+                    with open(daily_path, "a", encoding="utf-8") as f:
+                        f.write(body)
+                else:
+                    daily_path.write_text(
+                        self._daily_file_header(date, timestamp) + body,
+                        encoding="utf-8"
+                    )
 
                 logger.debug(f"Tagesdatei erstellt: {daily_path.name} mit {len(messages)} Nachrichten")
 
@@ -369,6 +492,7 @@ Erstellt: {timestamp}
 
         # Erstelle memory.md Index
         self._create_memory_index_from_migration(user_id)
+        self._exists_cache.pop(user_id, None)
 
         # Erstelle leere preferences.md
         prefs_path = self.file_structure.get_preferences_path(user_id)
@@ -387,8 +511,86 @@ Migriert von V1: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
         logger.info(f"Migration erfolgreich abgeschlossen für User {user_id}")
         return True
 
+    # Asynchrone Varianten für den Bot (Datei-I/O läuft in einem Worker-Thread)
+
+    async def acreate_user(self, user_id: int, username: str = None) -> bool:
+        """Asynchrone Variante von create_user()."""
+        return await asyncio.to_thread(self.create_user, user_id, username)
+
+    async def areset_user(self, user_id: int, username: str = None) -> bool:
+        """Asynchrone Variante von reset_user()."""
+        return await asyncio.to_thread(self.reset_user, user_id, username)
+
+    async def aappend_message(self, user_id: int, role: str, content: str) -> bool:
+        """Asynchrone Variante von append_message()."""
+        return await asyncio.to_thread(self.append_message, user_id, role, content)
+
+    async def aget_context(self, user_id: int, max_messages: int = 10) -> List[Dict[str, str]]:
+        """Asynchrone Variante von get_context()."""
+        return await asyncio.to_thread(self.get_context, user_id, max_messages)
+
+    async def amigrate_from_v1(self, user_id: int) -> bool:
+        """Asynchrone Variante von migrate_from_v1()."""
+        return await asyncio.to_thread(self.migrate_from_v1, user_id)
+
     # Private Hilfsmethoden
 
+    @staticmethod
+    def _dir_key(path: Path) -> Optional[Tuple[int, int]]:
+        """
+        Gibt (Inode, mtime_ns) eines Verzeichnisses zurück.
+
+        Ändert sich, sobald darin Einträge angelegt, gelöscht oder umbenannt
+        werden oder das Verzeichnis selbst ersetzt wird.
+
+        Returns:
+            Schlüssel oder None wenn das Verzeichnis nicht existiert
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _get_writer(self, user_id: int, daily_path: Path) -> int:
+        """
+        Gibt einen offen gehaltenen Append-Deskriptor für die Tagesdatei zurück.
+
+        Geschrieben wird ungepuffert per os.write; dank O_APPEND landet jeder
+        Schreibvorgang am Dateiende. Wechselt die Tagesdatei (neuer Tag), wird
+        der alte Deskriptor geschlossen. Der am längsten ungenutzte wird
+        geschlossen, sobald mehr als MAX_OPEN_WRITERS Dateien offen sind.
+
+        Args:
+            user_id: Telegram Benutzer-ID
+            daily_path: Pfad zur Tagesdatei
+
+        Returns:
+            Datei-Deskriptor im Append-Modus
+        """
+        cached = self._writers.get(user_id)
+
+        if cached is not None:
+            if cached[0] == daily_path:
+                self._writers.move_to_end(user_id)
+                return cached[1]
+            self._close_writer(user_id)
+
+        fd = os.open(daily_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        self._writers[user_id] = (daily_path, fd)
+
+        if len(self._writers) > self.MAX_OPEN_WRITERS:
+            _, (_, oldest) = self._writers.popitem(last=False)
+            os.close(oldest)
+
+        return fd
+
+    def _close_writer(self, user_id: int):
+        """Schließt den Append-Deskriptor eines Benutzers, falls vorhanden."""
+        cached = self._writers.pop(user_id, None)
+        if cached is not None:
+            os.close(cached[1])
+
     def _create_daily_file(self, user_id: int, date: datetime):
         """Erstellt eine neue Tagesdatei."""
         daily_path = self.file_structure.get_daily_file_path(user_id, date)
@@ -397,8 +599,11 @@ Migriert von V1: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
             return
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        daily_path.write_text(self._daily_file_header(date, timestamp), encoding="utf-8")
 
-        daily_content = f"""# Tagesdatei {date.strftime("%d.%m.%Y")}
+    def _daily_file_header(self, date: datetime, timestamp: str) -> str:
+        """Gibt den Kopf einer neuen Tagesdatei zurück."""
+        return f"""# Tagesdatei {date.strftime("%d.%m.%Y")}
 
 Erstellt: {timestamp}
 
@@ -408,46 +613,90 @@ Erstellt: {timestamp}
 
 """
 
-        daily_path.write_text(daily_content, encoding="utf-8")
+    def _parse_daily_file(self, file_path: Path, max_messages: Optional[int] = None,
+                          tail_bytes: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Parst eine Tagesdatei und extrahiert Nachrichten.
+
+        Vollständige Parse-Ergebnisse werden nach (mtime_ns, size) gecacht.
+        Mit max_messages und tail_bytes wird bei geänderten Dateien zunächst
+        nur das Dateiende gelesen; reicht das nicht, wird die ganze Datei geparst.
+
+        Args:
+            file_path: Pfad zur Tagesdatei
+            max_messages: Nur die letzten N Nachrichten zurückgeben (optional)
+            tail_bytes: Maximale Anzahl Bytes vom Dateiende für den Schnellpfad (optional)
 
-    def _parse_daily_file(self, file_path: Path) -> List[Dict[str, str]]:
-        """Parst eine Tagesdatei und extrahiert Nachrichten."""
-        if not file_path.exists():
+        Returns:
+            Liste von Dictionaries mit {"role": ..., "content": ...} (chronologisch)
+        """
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            with self._parse_lock:
+                self._parse_cache.pop(file_path, None)
             return []
 
-        content = file_path.read_text(encoding="utf-8")
+        with self._parse_lock:
+            cached = self._parse_cache.get(file_path)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                self._parse_cache.move_to_end(file_path)
+                messages = cached[2]
+                return messages[-max_messages:] if max_messages else list(messages)
+
+        if max_messages and tail_bytes and st.st_size > tail_bytes:
+            with open(file_path, "rb") as f:
+                f.seek(st.st_size - tail_bytes)
+                tail = f.read(tail_bytes)
+
+            # Erste (evtl. angeschnittene) Zeile verwerfen; Text vor dem ersten
+            # Header wird vom Parser ignoriert
+            newline = tail.find(b"\n")
+            if newline != -1:
+                messages = self._parse_daily_content(
+                    tail[newline + 1:].decode("utf-8", errors="replace")
+                )
+                if len(messages) >= max_messages:
+                    return messages[-max_messages:]
+
+        with open(file_path, "rb") as f:
+            content = f.read().decode("utf-8")
+        messages = self._parse_daily_content(content)
+
+        with self._parse_lock:
+            self._parse_cache[file_path] = (st.st_mtime_ns, st.st_size, messages)
+            self._parse_cache.move_to_end(file_path)
+            if len(self._parse_cache) > self.PARSE_CACHE_SIZE:
+                self._parse_cache.popitem(last=False)
+
+        return messages[-max_messages:] if max_messages else list(messages)
+
+    def _parse_daily_content(self, content: str) -> List[Dict[str, str]]:
+        """
+        Extrahiert Nachrichten aus dem Inhalt einer Tagesdatei.
+
+        Die Role-Header werden in einem Durchlauf mit einem vorkompilierten
+        Regex gefunden; nur die Zeilen innerhalb der Nachrichten werden noch
+        in Python gefiltert.
+        """
         messages = []
-        current_role = None
-        current_content = []
-
-        for line in content.split("\n"):
-            # Erkenne Role-Header
-            if line.startswith("### Benutzer - "):
-                if current_role and current_content:
-                    messages.append({
-                        "role": current_role,
-                        "content": "\n".join(current_content).strip()
-                    })
-                current_role = "user"
-                current_content = []
-            elif line.startswith("### Crowdbot - "):
-                if current_role and current_content:
-                    messages.append({
-                        "role": current_role,
-                        "content": "\n".join(current_content).strip()
-                    })
-                current_role = "assistant"
-                current_content = []
-            # Überspringe Trennlinien und Header
-            elif line.strip() and not line.startswith("---") and not line.startswith("#"):
-                current_content.append(line)
-
-        # Letzte Nachricht hinzufügen
-        if current_role and current_content:
-            messages.append({
-                "role": current_role,
-                "content": "\n".join(current_content).strip()
-            })
+        headers = list(_ROLE_HEADER_PATTERN.finditer(content))
+
+        for i, header in enumerate(headers):
+            body_end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+            body = content[header.end():body_end]
+
+            # Überspringe Trennlinien, Header und leere Zeilen
+            lines = [
+                line for line in body.split("\n")
+                if line.strip() and not line.startswith(_SKIP_PREFIXES)
+            ]
+
+            if lines:
+                messages.append({
+                    "role": _ROLE_HEADERS[header.group(1)],
+                    "content": "\n".join(lines).strip()
+                })
 
         return messages
 
@@ -455,41 +704,19 @@ Erstellt: {timestamp}
         """
         Parst V1 memory.md und gruppiert Nachrichten nach Datum.
 
+        Eine Nachricht reicht von ihrem Header bis vor den nächsten Header;
+        Text vor dem ersten Header wird verworfen.
+
         Returns:
             Dict mit Datum (YYYY-MM-DD) als Key und Liste von Nachrichten als Value
         """
         messages_by_date = {}
-        current_date = None
-        current_message = []
-
-        for line in content.split("\n"):
-            # Erkenne Timestamps in Headers
-            if line.startswith("### ") and " - " in line:
-                # Extrahiere Datum aus "### Benutzer - 2026-01-30 15:21:46"
-                try:
-                    timestamp_part = line.split(" - ", 1)[1]
-                    date_str = timestamp_part.split()[0]  # "2026-01-30"
-
-                    # Speichere vorherige Nachricht
-                    if current_date and current_message:
-                        if current_date not in messages_by_date:
-                            messages_by_date[current_date] = []
-                        messages_by_date[current_date].append("\n".join(current_message))
-
-                    current_date = date_str
-                    current_message = [line]
-
-                except (IndexError, ValueError):
-                    current_message.append(line)
-
-            else:
-                current_message.append(line)
-
-        # Letzte Nachricht speichern
-        if current_date and current_message:
-            if current_date not in messages_by_date:
-                messages_by_date[current_date] = []
-            messages_by_date[current_date].append("\n".join(current_message))
+        headers = list(_V1_HEADER_PATTERN.finditer(content))
+
+        for i, header in enumerate(headers):
+            # Zeilenumbruch vor dem nächsten Header gehört nicht zur Nachricht
+            end = headers[i + 1].start() - 1 if i + 1 < len(headers) else len(content)
+            messages_by_date.setdefault(header.group(1), []).append(content[header.start():end])
 
         return messages_by_date
 
@@ -545,22 +772,3 @@ Letzte Aktualisierung: {timestamp}
 
         memory_path = self.file_structure.get_memory_index_path(user_id)
         memory_path.write_text(memory_index, encoding="utf-8")
-
-    def _update_memory_index_timestamp(self, user_id: int):
-        """Aktualisiert den Timestamp in memory.md."""
-        memory_path = self.file_structure.get_memory_index_path(user_id)
-
-        if not memory_path.exists():
-            return
-
-        content = memory_path.read_text(encoding="utf-8")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Ersetze "Letzte Aktualisierung:" Zeile
-        lines = content.split("\n")
-        for i, line in enumerate(lines):
-            if line.startswith("Letzte Aktualisierung:"):
-                lines[i] = f"Letzte Aktualisierung: {timestamp}"
-                break
-
-        memory_path.write_text("\n".join(lines), encoding="utf-8")
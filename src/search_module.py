@@ -7,13 +7,53 @@ Verwendet Jina AI für Web-Suche und Deep Research:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, List
 import re
 
 
+# URL-Erkennung für is_url (einmal beim Import kompiliert, Prüfung per fullmatch)
+_URL_PATTERN = re.compile(
+    r'https?://'  # http:// oder https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # Domain
+    r'localhost|'  # localhost
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
+    r'(?::\d+)?'  # Port
+    r'(?:/?|[/?]\S+)', re.IGNORECASE
+)
+
+# Zeichenweise Ersetzungen für _make_tts_compatible in einem Durchlauf:
+# Markdown-Sonderzeichen entfernen, TTS-problematische Zeichen ersetzen
+_TTS_TRANSLATION = str.maketrans({
+    '*': None,
+    '_': None,
+    '`': None,
+    '=': ', ',  # Gleichheitszeichen zu Komma
+    '+': ' und ',  # Plus zu "und"
+    '|': ', ',  # Pipe zu Komma
+    '>': ', ',  # Größer als zu Komma
+    '<': ', ',  # Kleiner als zu Komma
+})
+
+# Markdown-Links [Text](URL) innerhalb einer Zeile
+_MARKDOWN_LINK_PATTERN = re.compile(r'\[([^\]\n]+)\]\([^\)\n]+\)')
+
+# Nackte URLs im Fließtext
+_BARE_URL_PATTERN = re.compile(r'https?://\S+')
+
+
 class SearchModule:
     """Modul für Internet-Suche und Web-Scraping."""
 
+    # Maximale Anzahl Zeichen, die fetch_url von einer Seite liest
+    FETCH_MAX_CHARS = 2 * 1024 * 1024
+
+    # Blockgröße beim gestreamten Lesen in fetch_url
+    FETCH_CHUNK_SIZE = 64 * 1024
+
+    # Gepoolte Verbindungen pro Host (wiederverwendet statt neuer TLS-Handshakes)
+    HTTP_POOL_SIZE = 10
+
     def __init__(
         self,
         jina_reader_url: str = "https://r.jina.ai",
@@ -32,6 +72,12 @@ class SearchModule:
         self.jina_proxy_url = jina_proxy_url
         self.perplexity_proxy_url = perplexity_proxy_url
 
+        # Gemeinsame Session für Connection-Pooling über alle Anfragen
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.HTTP_POOL_SIZE, pool_maxsize=self.HTTP_POOL_SIZE)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
     def is_url(self, text: str) -> bool:
         """
         Prüft, ob ein Text eine URL ist.
@@ -42,15 +88,11 @@ class SearchModule:
         Returns:
             True wenn es eine URL ist
         """
-        url_pattern = re.compile(
-            r'^https?://'  # http:// oder https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # Domain
-            r'localhost|'  # localhost
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
-            r'(?::\d+)?'  # Port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE
-        )
-        return url_pattern.match(text) is not None
+        # Schneller Ausstieg für normale Textnachrichten (Schema ohne Groß-/Kleinschreibung)
+        if not text[:8].lower().startswith(("http://", "https://")):
+            return False
+
+        return _URL_PATTERN.fullmatch(text) is not None
 
     def fetch_url(self, url: str, timeout: int = 10) -> Optional[str]:
         """
@@ -71,12 +113,25 @@ class SearchModule:
             # Jina Reader URL
             reader_url = f"{self.jina_reader_url}/{url}"
 
-            response = requests.get(reader_url, timeout=timeout)
+            response = self._session.get(reader_url, timeout=timeout, stream=True)
 
-            if response.status_code == 200:
-                return response.text
-            else:
-                return f"Fehler: HTTP {response.status_code}"
+            try:
+                if response.status_code != 200:
+                    return f"Fehler: HTTP {response.status_code}"
+
+                # Gestreamt lesen, feste Kodierung statt Erkennung über den ganzen Body
+                response.encoding = "utf-8"
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=self.FETCH_CHUNK_SIZE, decode_unicode=True):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.FETCH_MAX_CHARS:
+                        break
+
+                return "".join(chunks)[:self.FETCH_MAX_CHARS]
+            finally:
+                response.close()
 
         except Exception as e:
             return f"Fehler: {e}"
@@ -113,7 +168,7 @@ class SearchModule:
                 "max_tokens": max_tokens
             }
 
-            response = requests.post(url, json=payload, timeout=30)
+            response = self._session.post(url, json=payload, timeout=30)
 
             if response.status_code == 200:
                 data = response.json()
@@ -184,7 +239,7 @@ class SearchModule:
                 "stream": False
             }
 
-            response = requests.post(url, json=payload, timeout=120)
+            response = self._session.post(url, json=payload, timeout=120)
 
             if response.status_code == 200:
                 data = response.json()
@@ -217,13 +272,10 @@ class SearchModule:
         if not text:
             return ""
 
-        import re
-
         # Zeilenweise verarbeiten
-        lines = text.split('\n')
-        result_lines = []
+        lines = []
 
-        for line in lines:
+        for line in text.split('\n'):
             line = line.strip()
             if not line:
                 continue
@@ -232,46 +284,30 @@ class SearchModule:
             while line.startswith('#'):
                 line = line[1:].strip()
 
-            # Markdown-Sonderzeichen entfernen (alle Varianten)
-            line = line.replace('**', '').replace('__', '')
-            line = line.replace('*', '').replace('_', '')
-            line = line.replace('`', '').replace('```', '')
-
-            # Code-Blöcke entfernen
-            line = re.sub(r'```.*?```', '', line, flags=re.DOTALL)
-
-            # TTS-problematische Sonderzeichen entfernen oder ersetzen
-            line = line.replace('=', ', ')  # Gleichheitszeichen zu Komma
-            line = line.replace('+', ' und ')  # Plus zu "und"
-            line = line.replace('|', ', ')  # Pipe zu Komma
-            line = line.replace('>', ', ')  # Größer als zu Komma
-            line = line.replace('<', ', ')  # Kleiner als zu Komma
+            # Markdown- und TTS-problematische Sonderzeichen in einem Durchlauf
+            # (entfernt auch ``` und damit Code-Block-Markierungen)
+            line = line.translate(_TTS_TRANSLATION)
 
             # Listenpunkte in ganzzählige Form umwandeln
             if line.startswith('- '):
                 line = line[2:]
-            elif line.startswith('* '):
-                line = line[2:]
             elif line.startswith('1. ') or line.startswith('2. ') or line.startswith('3. '):
                 # Nummerierte Listen
-                parts = line.split('. ', 1)
-                if len(parts) == 2:
-                    line = parts[1]
+                line = line[3:]
 
-            # Links umwandeln: [Text](URL) -> Text
-            line = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', line)
+            lines.append(line)
 
-            # URLs entfernen (stehen oft noch im Text)
-            line = re.sub(r'https?://[^\s]+', '', line)
+        # Links und URLs für alle Zeilen gemeinsam ersetzen (Muster bleiben in ihrer Zeile)
+        result = '\n'.join(lines)
 
-            # Mehrere Leerzeichen reduzieren
-            line = ' '.join(line.split())
+        # Links umwandeln: [Text](URL) -> Text
+        result = _MARKDOWN_LINK_PATTERN.sub(r'\1', result)
 
-            if line:
-                result_lines.append(line)
+        # URLs entfernen (stehen oft noch im Text)
+        result = _BARE_URL_PATTERN.sub('', result)
 
-        # Zu einem Fließtext zusammenfügen
-        result = ' '.join(result_lines)
+        # Mehrere Leerzeichen reduzieren und zu einem Fließtext zusammenfügen
+        result = ' '.join(result.split())
 
         # Satzzeichen optimieren für TTS
         result = result.replace(' . ', '. ')
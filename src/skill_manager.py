@@ -4,16 +4,37 @@ Skill Manager für Crowdbot
 Verwaltet wiederverwendbare Python-Scripts ("Skills") die aus erfolgreichen Tasks erstellt werden.
 """
 
+import asyncio
+import contextlib
+import importlib.util
 import json
 import logging
+import os
+import py_compile
+import shutil
+import signal
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from datetime import datetime
 import subprocess
 import sys
 
+from src.file_structure import atomic_write_text
+
 logger = logging.getLogger(__name__)
 
+# Dateiname des Metadaten-Index im Skills-Verzeichnis
+_INDEX_FILENAME = "_index.json"
+
+# Skill-Name, der mit dem Index kollidieren würde (im alten Format <name>.json)
+_RESERVED_SKILL_NAME = "_index"
+
+# Dateien im Verzeichnis eines Skills
+_META_FILENAME = "meta.json"
+_SCRIPT_FILENAME = "script.py"
+_BYTECODE_FILENAME = "script.pyc"
+
 
 class SkillManager:
     """
@@ -23,6 +44,12 @@ class SkillManager:
     und mit Argumenten aufgerufen werden kann.
     """
 
+    # Maximale Laufzeit eines Skills in Sekunden
+    SKILL_TIMEOUT = 30
+
+    # Anzahl geparster Skill-Metadaten im Speicher (LRU)
+    SKILL_CACHE_SIZE = 256
+
     def __init__(self, data_dir: str = "./data"):
         """
         Initialisiert den Skill Manager.
@@ -32,6 +59,18 @@ class SkillManager:
         """
         self.data_dir = Path(data_dir)
 
+        # Skill-Metadaten pro User: user_id -> {skill_name: Metadaten}
+        self._indexes: Dict[int, Dict[str, Dict[str, Any]]] = {}
+
+        # Geparste Metadaten: (user_id, skill_name) -> (mtime_ns, size, meta)
+        self._skill_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+        # Bereits angelegte Skills-Verzeichnisse: user_id -> Pfad
+        self._skill_dirs: Dict[int, Path] = {}
+
+        # User, deren Workspace-Verzeichnis bereits angelegt ist
+        self._ensured_workspaces: Set[int] = set()
+
     def _get_skill_dir(self, user_id: int) -> Path:
         """
         Gibt das Skills-Verzeichnis für einen Benutzer zurück.
@@ -42,23 +81,221 @@ class SkillManager:
         Returns:
             Pfad zum Skills-Verzeichnis
         """
-        skill_dir = self.data_dir / "users" / str(user_id) / "important" / "skills"
-        skill_dir.mkdir(parents=True, exist_ok=True)
+        skill_dir = self._skill_dirs.get(user_id)
+        if skill_dir is None:
+            skill_dir = self.data_dir / "users" / str(user_id) / "important" / "skills"
+            skill_dir.mkdir(parents=True, exist_ok=True)
+            self._skill_dirs[user_id] = skill_dir
         return skill_dir
 
+    def forget_user(self, user_id: int):
+        """
+        Verwirft alle zwischengespeicherten Daten eines Benutzers.
+
+        Muss aufgerufen werden, wenn das Benutzerverzeichnis außerhalb des
+        SkillManagers verschoben oder gelöscht wurde (z.B. bei /reset).
+
+        Args:
+            user_id: Benutzer-ID
+        """
+        self._indexes.pop(user_id, None)
+        self._skill_dirs.pop(user_id, None)
+        self._ensured_workspaces.discard(user_id)
+        for key in [key for key in self._skill_cache if key[0] == user_id]:
+            del self._skill_cache[key]
+
     def _get_skill_path(self, user_id: int, skill_name: str) -> Path:
         """
-        Gibt den Pfad zur Skill-Datei zurück.
+        Gibt den Pfad zum Verzeichnis eines Skills zurück.
+
+        Das Verzeichnis enthält script.py (das Script im Klartext) und
+        meta.json (alle übrigen Skill-Daten).
 
         Args:
             user_id: Benutzer-ID
             skill_name: Name des Skills
 
         Returns:
-            Pfad zur Skill-Datei
+            Pfad zum Skill-Verzeichnis
         """
         skill_dir = self._get_skill_dir(user_id)
-        return skill_dir / f"{skill_name}.json"
+        return skill_dir / skill_name
+
+    @staticmethod
+    def _is_valid_skill_name(skill_name: str) -> bool:
+        """
+        Prüft ob ein Skill-Name als Verzeichnisname zulässig ist.
+
+        Abgelehnt werden leere Namen, Pfadangaben und der reservierte Name
+        des Metadaten-Index.
+
+        Args:
+            skill_name: Name des Skills
+
+        Returns:
+            True wenn zulässig
+        """
+        return (
+            bool(skill_name)
+            and skill_name not in (".", "..", _RESERVED_SKILL_NAME)
+            and "/" not in skill_name
+            and os.sep not in skill_name
+        )
+
+    def _write_skill(
+        self,
+        user_id: int,
+        skill_name: str,
+        meta: Dict[str, Any],
+        script: Optional[str] = None
+    ):
+        """
+        Schreibt Metadaten und optional das Script eines Skills.
+
+        Args:
+            user_id: Benutzer-ID
+            skill_name: Name des Skills
+            meta: Skill-Daten ohne Script
+            script: Neues Script (None = Script bleibt unverändert)
+        """
+        skill_path = self._get_skill_path(user_id, skill_name)
+        skill_path.mkdir(exist_ok=True)
+
+        if script is not None:
+            atomic_write_text(skill_path / _SCRIPT_FILENAME, script)
+            self._compile_script(skill_path / _SCRIPT_FILENAME)
+
+        atomic_write_text(skill_path / _META_FILENAME, json.dumps(meta, indent=2, ensure_ascii=False))
+
+        self._skill_cache.pop((user_id, skill_name), None)
+        self._load_index(user_id)[skill_name] = self._index_entry(meta)
+        self._save_index(user_id)
+
+    def _migrate_legacy_skills(self, user_id: int) -> bool:
+        """
+        Wandelt Skills im alten Format (<name>.json inkl. Script) in das
+        Verzeichnisformat um.
+
+        Returns:
+            True wenn mindestens ein Skill umgewandelt wurde
+        """
+        migrated = False
+
+        with os.scandir(self._get_skill_dir(user_id)) as entries:
+            legacy_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".json")
+                and entry.name != _INDEX_FILENAME
+                and entry.is_file(follow_symlinks=False)
+            ]
+
+        for legacy_file in legacy_files:
+            try:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    skill_data = json.load(f)
+
+                skill_path = self._get_skill_path(user_id, legacy_file.stem)
+                skill_path.mkdir(exist_ok=True)
+                atomic_write_text(skill_path / _SCRIPT_FILENAME, skill_data.pop("script", ""))
+                atomic_write_text(skill_path / _META_FILENAME, json.dumps(skill_data, indent=2, ensure_ascii=False))
+
+                legacy_file.unlink()
+                migrated = True
+                logger.info(f"Skill {legacy_file.stem} für User {user_id} ins Verzeichnisformat migriert")
+            except Exception as e:
+                logger.error(f"Fehler beim Migrieren von {legacy_file}: {e}")
+                continue
+
+        return migrated
+
+    def _load_index(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Gibt den Metadaten-Index der Skills eines Benutzers zurück.
+
+        Der Index wird einmal aus _index.json geladen und im Speicher gehalten.
+        Fehlt die Datei oder wurden Skills aus älteren Versionen migriert,
+        wird er einmalig aus den Skill-Verzeichnissen aufgebaut und gespeichert.
+
+        Args:
+            user_id: Benutzer-ID
+
+        Returns:
+            Dict mit Skill-Name als Key und Metadaten als Value
+        """
+        index = self._indexes.get(user_id)
+        if index is not None:
+            return index
+
+        index_path = self._get_skill_dir(user_id) / _INDEX_FILENAME
+
+        if not self._migrate_legacy_skills(user_id):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if not isinstance(index, dict):
+                    logger.error(f"Skill-Index für User {user_id} ist ungültig, wird neu aufgebaut")
+                    index = None
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Fehler beim Laden des Skill-Index für User {user_id}: {e}")
+
+        if index is None:
+            index = self._rebuild_index(user_id)
+            self._indexes[user_id] = index
+            self._save_index(user_id)
+        else:
+            self._indexes[user_id] = index
+
+        return index
+
+    def _rebuild_index(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+        """Baut den Metadaten-Index aus den meta.json der Skill-Verzeichnisse auf."""
+        index = {}
+
+        with os.scandir(self._get_skill_dir(user_id)) as entries:
+            skill_dirs = [(entry.name, entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+        for skill_name, skill_path in skill_dirs:
+            meta_file = os.path.join(skill_path, _META_FILENAME)
+            try:
+                with open(meta_file, 'r', encoding='utf-8') as f:
+                    index[skill_name] = self._index_entry(json.load(f))
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error(f"Fehler beim Laden von {meta_file}: {e}")
+                continue
+
+        return index
+
+    def _save_index(self, user_id: int):
+        """
+        Schreibt den Metadaten-Index eines Benutzers nach _index.json.
+
+        Der Index wird bei jeder Änderung neu geschrieben und nur maschinell
+        gelesen, daher kompakt ohne Einrückung - so läuft die Kodierung
+        komplett im C-Encoder von json.
+        """
+        index_path = self._get_skill_dir(user_id) / _INDEX_FILENAME
+
+        try:
+            atomic_write_text(
+                index_path,
+                json.dumps(self._indexes.get(user_id, {}), ensure_ascii=False, separators=(",", ":"))
+            )
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern des Skill-Index für User {user_id}: {e}")
+
+    @staticmethod
+    def _index_entry(skill_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrahiert die Metadaten für list_skills aus den Skill-Daten."""
+        return {
+            "name": skill_data["name"],
+            "description": skill_data["description"],
+            "created_at": skill_data["created_at"],
+            "version": skill_data["current_version"]
+        }
 
     def save_skill(
         self,
@@ -79,6 +316,10 @@ class SkillManager:
         Returns:
             True wenn erfolgreich, False sonst
         """
+        if not self._is_valid_skill_name(skill_name):
+            logger.error(f"Ungültiger Skill-Name: {skill_name!r}")
+            return False
+
         # Task laden
         task = task_manager.get_task(user_id, task_id)
 
@@ -101,26 +342,21 @@ class SkillManager:
             logger.error(f"Task {task_id} hat Fehler in letzter Execution")
             return False
 
-        # Skill-Daten erstellen
-        skill_data = {
+        # Skill-Metadaten erstellen (Script wird separat als script.py gespeichert)
+        meta = {
             "name": skill_name,
             "description": task["description"],
             "created_at": datetime.now().isoformat(),
             "source_task_id": task_id,
             "current_version": latest_execution["version"],
-            "script": latest_execution["script"],
             "last_execution": {
                 "timestamp": latest_execution["timestamp"],
                 "output": latest_execution.get("output", "")
             }
         }
 
-        # Skill speichern
-        skill_path = self._get_skill_path(user_id, skill_name)
-
         try:
-            with open(skill_path, 'w', encoding='utf-8') as f:
-                json.dump(skill_data, f, indent=2, ensure_ascii=False)
+            self._write_skill(user_id, skill_name, meta, latest_execution["script"])
 
             logger.info(f"Skill {skill_name} für User {user_id} gespeichert")
             return True
@@ -131,7 +367,7 @@ class SkillManager:
 
     def get_skill(self, user_id: int, skill_name: str) -> Optional[Dict[str, Any]]:
         """
-        Lädt einen Skill.
+        Lädt die Metadaten eines Skills (ohne Script, siehe get_skill_script).
 
         Args:
             user_id: Benutzer-ID
@@ -140,18 +376,68 @@ class SkillManager:
         Returns:
             Skill-Daten oder None
         """
-        skill_path = self._get_skill_path(user_id, skill_name)
+        if not self._is_valid_skill_name(skill_name):
+            return None
+
+        self._load_index(user_id)
+
+        meta_path = self._get_skill_path(user_id, skill_name) / _META_FILENAME
+        key = (user_id, skill_name)
 
-        if not skill_path.exists():
+        try:
+            st = meta_path.stat()
+        except FileNotFoundError:
+            self._skill_cache.pop(key, None)
             return None
 
+        # Unveränderte Datei: geparste Daten wiederverwenden
+        cached = self._skill_cache.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            self._skill_cache.move_to_end(key)
+            return self._copy_skill(cached[2])
+
         try:
-            with open(skill_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                skill = json.load(f)
         except Exception as e:
             logger.error(f"Fehler beim Laden von Skill {skill_name}: {e}")
             return None
 
+        self._skill_cache[key] = (st.st_mtime_ns, st.st_size, skill)
+        self._skill_cache.move_to_end(key)
+        if len(self._skill_cache) > self.SKILL_CACHE_SIZE:
+            self._skill_cache.popitem(last=False)
+
+        return self._copy_skill(skill)
+
+    def get_skill_script(self, user_id: int, skill_name: str) -> Optional[str]:
+        """
+        Lädt das Python-Script eines Skills.
+
+        Args:
+            user_id: Benutzer-ID
+            skill_name: Name des Skills
+
+        Returns:
+            Script als Text oder None
+        """
+        if not self._is_valid_skill_name(skill_name):
+            return None
+
+        self._load_index(user_id)
+
+        script_path = self._get_skill_path(user_id, skill_name) / _SCRIPT_FILENAME
+
+        try:
+            return script_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _copy_skill(skill: Dict[str, Any]) -> Dict[str, Any]:
+        """Kopiert Skill-Daten, damit Aufrufer den Cache nicht verändern."""
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in skill.items()}
+
     def list_skills(self, user_id: int) -> List[Dict[str, Any]]:
         """
         Listet alle Skills eines Benutzers auf.
@@ -162,23 +448,7 @@ class SkillManager:
         Returns:
             Liste von Skill-Metadaten
         """
-        skill_dir = self._get_skill_dir(user_id)
-        skills = []
-
-        for skill_file in skill_dir.glob("*.json"):
-            try:
-                with open(skill_file, 'r', encoding='utf-8') as f:
-                    skill_data = json.load(f)
-                    skills.append({
-                        "name": skill_data["name"],
-                        "description": skill_data["description"],
-                        "created_at": skill_data["created_at"],
-                        "version": skill_data["current_version"]
-                    })
-            except Exception as e:
-                logger.error(f"Fehler beim Laden von {skill_file}: {e}")
-                continue
-
+        skills = [dict(entry) for entry in self._load_index(user_id).values()]
         return sorted(skills, key=lambda x: x["created_at"], reverse=True)
 
     def run_skill(
@@ -198,59 +468,157 @@ class SkillManager:
         Returns:
             (success, output/error)
         """
-        skill = self.get_skill(user_id, skill_name)
+        if not self._is_valid_skill_name(skill_name):
+            return False, f"Ungültiger Skill-Name: {skill_name}"
 
-        if not skill:
+        self._load_index(user_id)
+
+        # Script liegt bereits als .py vor und wird direkt ausgeführt
+        script_file = self._get_skill_path(user_id, skill_name) / _SCRIPT_FILENAME
+
+        try:
+            script_stat = script_file.stat()
+        except FileNotFoundError:
             return False, f"Skill {skill_name} nicht gefunden"
 
-        script = skill["script"]
+        # Vorkompilierten Bytecode bevorzugen: Python nutzt für das
+        # Hauptscript keinen .pyc-Cache und würde sonst bei jedem Aufruf
+        # neu parsen und kompilieren
+        run_file = self._get_bytecode(script_file, script_stat) or script_file
 
         # Workspace-Verzeichnis erstellen
         workspace = self.data_dir / "users" / str(user_id) / "important" / "tasks" / "workspace"
-        workspace.mkdir(parents=True, exist_ok=True)
-
-        # Script-Datei erstellen
-        script_file = workspace / f"{skill_name}_temp.py"
+        if user_id not in self._ensured_workspaces:
+            workspace.mkdir(parents=True, exist_ok=True)
+            self._ensured_workspaces.add(user_id)
 
         try:
-            with open(script_file, 'w', encoding='utf-8') as f:
-                f.write(script)
-
             # Script ausführen mit Argumenten
-            cmd = [sys.executable, str(script_file)]
+            cmd = [sys.executable, str(run_file)]
             if args:
                 cmd.extend(args)
 
-            result = subprocess.run(
+            # Eigene Prozessgruppe, damit beim Timeout auch vom Script
+            # gestartete Kindprozesse beendet werden. Sonst halten diese die
+            # Pipes offen und das Auslesen der Ausgabe blockiert weiter.
+            process = subprocess.Popen(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=30,
-                cwd=str(workspace)
+                cwd=str(workspace),
+                start_new_session=(os.name == "posix")
             )
 
-            # Cleanup
-            script_file.unlink()
-
-            if result.returncode == 0:
-                output = result.stdout or "Script erfolgreich ausgeführt (keine Ausgabe)"
+            try:
+                stdout, stderr = process.communicate(timeout=self.SKILL_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._kill_process_tree(process)
+                process.communicate()
+                logger.error(f"Skill {skill_name} Timeout")
+                return False, f"Timeout: Script dauerte länger als {self.SKILL_TIMEOUT} Sekunden"
+
+            if process.returncode == 0:
+                output = stdout or "Script erfolgreich ausgeführt (keine Ausgabe)"
                 logger.info(f"Skill {skill_name} für User {user_id} erfolgreich ausgeführt")
                 return True, output
             else:
-                error = result.stderr or f"Script fehlgeschlagen mit Exit-Code {result.returncode}"
+                error = stderr or f"Script fehlgeschlagen mit Exit-Code {process.returncode}"
                 logger.error(f"Skill {skill_name} fehlgeschlagen: {error}")
                 return False, error
 
-        except subprocess.TimeoutExpired:
-            logger.error(f"Skill {skill_name} Timeout")
-            return False, "Timeout: Script dauerte länger als 30 Sekunden"
         except Exception as e:
             logger.error(f"Fehler beim Ausführen von Skill {skill_name}: {e}")
             return False, f"Fehler: {str(e)}"
-        finally:
-            # Cleanup falls noch vorhanden
-            if script_file.exists():
-                script_file.unlink()
+
+    async def arun_skill(
+        self,
+        user_id: int,
+        skill_name: str,
+        args: Optional[List[str]] = None
+    ) -> tuple[bool, str]:
+        """Asynchrone Variante von run_skill() (blockiert die Event-Loop nicht)."""
+        return await asyncio.to_thread(self.run_skill, user_id, skill_name, args)
+
+    @staticmethod
+    def _compile_script(script_file: Path) -> bool:
+        """
+        Kompiliert das Script eines Skills nach script.pyc.
+
+        Args:
+            script_file: Pfad zu script.py
+
+        Returns:
+            True wenn erfolgreich (False z.B. bei Syntaxfehlern)
+        """
+        bytecode_file = script_file.with_name(_BYTECODE_FILENAME)
+        try:
+            # Immer Timestamp-Header, auch wenn SOURCE_DATE_EPOCH gesetzt ist
+            # (sonst erzeugt py_compile Hash-basierte .pyc, die _get_bytecode
+            # nie als aktuell erkennt)
+            py_compile.compile(
+                str(script_file),
+                cfile=str(bytecode_file),
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.TIMESTAMP
+            )
+            return True
+        except (py_compile.PyCompileError, OSError) as e:
+            logger.debug(f"Script {script_file} nicht kompiliert: {e}")
+            # Alten Bytecode entfernen: sein Header könnte sonst nach einer
+            # Änderung mit gleicher Sekunde und Größe wieder passen
+            with contextlib.suppress(OSError):
+                bytecode_file.unlink()
+            return False
+
+    def _get_bytecode(self, script_file: Path, script_stat: os.stat_result) -> Optional[Path]:
+        """
+        Gibt den zum Script passenden Bytecode zurück und kompiliert neu,
+        wenn er fehlt oder veraltet ist.
+
+        Wird eine .pyc-Datei direkt ausgeführt, prüft Python nicht gegen
+        die Quelle. Daher wird der Header (Magic, mtime, Größe) hier genauso
+        verglichen wie beim Import.
+
+        Args:
+            script_file: Pfad zu script.py
+            script_stat: stat-Ergebnis von script.py
+
+        Returns:
+            Pfad zu script.pyc oder None wenn nicht verfügbar
+        """
+        bytecode_file = script_file.with_name(_BYTECODE_FILENAME)
+        expected = (
+            importlib.util.MAGIC_NUMBER
+            + (0).to_bytes(4, "little")
+            + (int(script_stat.st_mtime) & 0xFFFFFFFF).to_bytes(4, "little")
+            + (script_stat.st_size & 0xFFFFFFFF).to_bytes(4, "little")
+        )
+
+        try:
+            with open(bytecode_file, "rb") as f:
+                if f.read(16) == expected:
+                    return bytecode_file
+        except FileNotFoundError:
+            pass
+
+        return bytecode_file if self._compile_script(script_file) else None
+
+    @staticmethod
+    def _kill_process_tree(process: subprocess.Popen):
+        """
+        Beendet einen Skill-Prozess samt seiner Prozessgruppe.
+
+        Args:
+            process: Laufender Prozess (unter POSIX mit eigener Session gestartet)
+        """
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
 
     def delete_skill(self, user_id: int, skill_name: str) -> bool:
         """
@@ -263,15 +631,24 @@ class SkillManager:
         Returns:
             True wenn erfolgreich, False sonst
         """
-        skill_path = self._get_skill_path(user_id, skill_name)
-
-        if not skill_path.exists():
+        if not self._is_valid_skill_name(skill_name):
             return False
 
+        self._load_index(user_id)
+
+        skill_path = self._get_skill_path(user_id, skill_name)
+
         try:
-            skill_path.unlink()
+            shutil.rmtree(skill_path)
+            self._skill_cache.pop((user_id, skill_name), None)
+
+            if self._load_index(user_id).pop(skill_name, None) is not None:
+                self._save_index(user_id)
+
             logger.info(f"Skill {skill_name} für User {user_id} gelöscht")
             return True
+        except FileNotFoundError:
+            return False
         except Exception as e:
             logger.error(f"Fehler beim Löschen von Skill {skill_name}: {e}")
             return False
@@ -298,15 +675,11 @@ class SkillManager:
         if not skill:
             return False
 
-        skill["script"] = new_script
         skill["current_version"] += 1
         skill["updated_at"] = datetime.now().isoformat()
 
-        skill_path = self._get_skill_path(user_id, skill_name)
-
         try:
-            with open(skill_path, 'w', encoding='utf-8') as f:
-                json.dump(skill, f, indent=2, ensure_ascii=False)
+            self._write_skill(user_id, skill_name, skill, new_script)
 
             logger.info(f"Skill {skill_name} für User {user_id} aktualisiert")
             return True
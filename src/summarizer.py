@@ -9,13 +9,40 @@ Erstellt intelligente Zusammenfassungen von Konversationen:
 """
 
 import logging
+import os
+import re
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from .file_structure import atomic_write_text
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_date_stem(stem: str) -> Optional[datetime]:
+    """
+    Wandelt einen Dateinamen im Format YYYYMMDD in ein Datum um.
+
+    Schneller als strptime, da das Format fest ist.
+
+    Args:
+        stem: Dateiname ohne Endung
+
+    Returns:
+        datetime oder None bei ungültigem Namen
+    """
+    if len(stem) != 8 or not stem.isdigit():
+        return None
+    try:
+        return datetime(int(stem[:4]), int(stem[4:6]), int(stem[6:8]))
+    except ValueError:
+        return None
+
+
 class Summarizer:
     """
     Erstellt Zusammenfassungen von Konversationen mit LLM.
@@ -23,6 +50,24 @@ class Summarizer:
     Progressive Verdichtung: Soft Trim → Weekly → Monthly → Yearly
     """
 
+    # Tagesdateien unter dieser Größe werden beim Soft Trim nicht gekürzt
+    MIN_TRIM_BYTES = 2048
+
+    # Maximale Anzahl paralleler Lesezugriffe auf Quelldateien
+    MAX_READ_WORKERS = 8
+
+    # Anzahl zuletzt erstellter Monatszusammenfassungen im Speicher (LRU)
+    MONTHLY_CACHE_SIZE = 24
+
+    # Vorkompilierte Muster für _clean_markdown
+    _RE_CODE_BLOCK = re.compile(r"```[\s\S]*?```")
+    _RE_BOLD_STAR = re.compile(r"\*\*(.+?)\*\*")
+    _RE_ITALIC_STAR = re.compile(r"\*(.+?)\*")
+    _RE_BOLD_UNDERSCORE = re.compile(r"__(.+?)__")
+    _RE_ITALIC_UNDERSCORE = re.compile(r"_(.+?)_")
+    _RE_INLINE_CODE = re.compile(r"`(.+?)`")
+    _RE_HEADER = re.compile(r"#+\s")
+
     # Prompt für Soft Trim (T+1)
     SOFT_TRIM_PROMPT = """Analysiere die folgende Tagesdatei und kürze unwichtige Details.
 
@@ -72,6 +117,9 @@ Fokussiere auf Informationen mit hoher Wichtigkeit (Score >= 5).
 Ignoriere einmalige Fakten-Anfragen (TV-Programm, Wetter, etc.).
 Nutze Fließtext, KEIN Markdown (für TTS-Kompatibilität)."""
 
+    # WEEKLY_SUMMARY_PROMPT aufgeteilt am Platzhalter für die Tagesdateien
+    _WEEKLY_PROMPT_HEAD, _, _WEEKLY_PROMPT_TAIL = WEEKLY_SUMMARY_PROMPT.partition("{daily_files_content}")
+
     # Prompt für Monthly Summary
     MONTHLY_SUMMARY_PROMPT = """Erstelle eine Monatszusammenfassung aus den folgenden Wochenzusammenfassungen.
 
@@ -113,6 +161,10 @@ Nutze Fließtext, KEIN Markdown."""
         self.llm_client = llm_client
         self.scorer = importance_scorer
 
+        # Zuletzt geschriebene Monatszusammenfassungen für create_yearly_summary:
+        # Pfad -> (mtime_ns, size, Inhalt)
+        self._monthly_cache: "OrderedDict[Path, tuple]" = OrderedDict()
+
     def soft_trim_daily_file(self, file_path: Path,
                             importance_scores: Dict = None) -> bool:
         """
@@ -127,10 +179,18 @@ Nutze Fließtext, KEIN Markdown."""
         Returns:
             True wenn erfolgreich
         """
-        if not file_path.exists():
+        try:
+            file_size = file_path.stat().st_size
+        except FileNotFoundError:
             logger.error(f"Datei nicht gefunden: {file_path}")
             return False
 
+        # Kleine Dateien lohnen den LLM-Aufruf nicht
+        if file_size < self.MIN_TRIM_BYTES:
+            logger.info(f"Soft Trim für {file_path.name} übersprungen "
+                       f"(nur {file_size} Bytes)")
+            return True
+
         if importance_scores is None:
             importance_scores = {}
 
@@ -165,7 +225,7 @@ Nutze Fließtext, KEIN Markdown."""
             trimmed_content = trimmed_content.strip()
 
             # Schreibe zurück
-            file_path.write_text(trimmed_content, encoding="utf-8")
+            atomic_write_text(file_path, trimmed_content)
 
             saved_chars = len(content) - len(trimmed_content)
             logger.info(f"Soft Trim abgeschlossen: {saved_chars} Zeichen gespart "
@@ -200,35 +260,46 @@ Nutze Fließtext, KEIN Markdown."""
         logger.info(f"Erstelle Weekly Summary KW {week_number}/{year} "
                    f"aus {len(daily_files)} Tagesdateien")
 
-        # Lese alle Tagesdateien
-        daily_contents = []
+        # Datum einmal pro Datei aus dem Namen (YYYYMMDD) bestimmen
+        dated_files = []
         for daily_file in sorted(daily_files):
-            try:
-                content = daily_file.read_text(encoding="utf-8")
-                date_str = datetime.strptime(daily_file.stem, "%Y%m%d").strftime("%d.%m.%Y")
-                daily_contents.append(f"## {date_str}\n\n{content}\n\n---\n")
-            except Exception as e:
-                logger.error(f"Fehler beim Lesen von {daily_file.name}: {e}")
+            date = _parse_date_stem(daily_file.stem)
+            if date is None:
+                logger.error(f"Ungültiger Dateiname für Tagesdatei: {daily_file.name}")
                 continue
+            dated_files.append((daily_file, date))
+
+        # Lese alle Tagesdateien
+        contents = self._read_files([daily_file for daily_file, _ in dated_files])
+        daily_contents = [
+            (date, content)
+            for (_, date), (_, content) in zip(dated_files, contents)
+            if content is not None
+        ]
 
         if not daily_contents:
             logger.error("Keine lesbaren Tagesdateien")
             return False
 
         # Bestimme Zeitraum
-        first_date = datetime.strptime(daily_files[0].stem, "%Y%m%d")
-        last_date = datetime.strptime(daily_files[-1].stem, "%Y%m%d")
-        start_date = first_date.strftime("%d.%m.%Y")
-        end_date = last_date.strftime("%d.%m.%Y")
+        start_date = f"{dated_files[0][1]:%d.%m.%Y}"
+        end_date = f"{dated_files[-1][1]:%d.%m.%Y}"
 
         try:
-            # Erstelle Prompt
-            prompt = self.WEEKLY_SUMMARY_PROMPT.format(
-                start_date=start_date,
-                end_date=end_date,
-                week_number=week_number,
-                daily_files_content="\n".join(daily_contents)
-            )
+            # Erstelle Prompt in einem einzigen join (kein Zwischenstring
+            # pro Tag und kein separater Gesamtinhalt der Tagesdateien)
+            fields = {
+                "start_date": start_date,
+                "end_date": end_date,
+                "week_number": week_number,
+            }
+            parts = [self._WEEKLY_PROMPT_HEAD.format(**fields)]
+            for i, (date, content) in enumerate(daily_contents):
+                if i:
+                    parts.append("\n")
+                parts.extend((f"## {date:%d.%m.%Y}\n\n", content, "\n\n---\n"))
+            parts.append(self._WEEKLY_PROMPT_TAIL.format(**fields))
+            prompt = "".join(parts)
 
             # LLM-Aufruf
             summary = self.llm_client.send_message(
@@ -261,7 +332,7 @@ Vollständige Details sind in den archivierten Tagesdateien verfügbar.
 
             # Schreibe Datei
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(final_content, encoding="utf-8")
+            atomic_write_text(output_path, final_content)
 
             logger.info(f"Weekly Summary erstellt: {output_path.name}")
             return True
@@ -298,14 +369,10 @@ Vollständige Details sind in den archivierten Tagesdateien verfügbar.
                    f"aus {len(weekly_files)} Wochenzusammenfassungen")
 
         # Lese alle Wochenzusammenfassungen
-        weekly_contents = []
-        for weekly_file in sorted(weekly_files):
-            try:
-                content = weekly_file.read_text(encoding="utf-8")
-                weekly_contents.append(content)
-            except Exception as e:
-                logger.error(f"Fehler beim Lesen von {weekly_file.name}: {e}")
-                continue
+        weekly_contents = [
+            content for _, content in self._read_files(sorted(weekly_files))
+            if content is not None
+        ]
 
         if not weekly_contents:
             logger.error("Keine lesbaren Wochenzusammenfassungen")
@@ -349,7 +416,8 @@ Details sind in den archivierten Wochenzusammenfassungen verfügbar.
 
             # Schreibe Datei
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(final_content, encoding="utf-8")
+            atomic_write_text(output_path, final_content)
+            self._remember_monthly(output_path, final_content)
 
             logger.info(f"Monthly Summary erstellt: {output_path.name}")
             return True
@@ -380,23 +448,12 @@ Details sind in den archivierten Wochenzusammenfassungen verfügbar.
         logger.info(f"Erstelle Yearly Summary {year} "
                    f"aus {len(monthly_files)} Monatszusammenfassungen")
 
-        # Lese alle Monatszusammenfassungen
-        monthly_contents = []
-        for monthly_file in sorted(monthly_files):
-            try:
-                content = monthly_file.read_text(encoding="utf-8")
-                monthly_contents.append(content)
-            except Exception as e:
-                logger.error(f"Fehler beim Lesen von {monthly_file.name}: {e}")
-                continue
-
-        if not monthly_contents:
-            return False
-
-        # Einfache Konkatenation für Yearly (kann später mit LLM verbessert werden)
+        # Einfache Konkatenation für Yearly (kann später mit LLM verbessert werden).
+        # Die Monatsdateien werden direkt in eine temporäre Datei kopiert statt
+        # komplett in den Speicher gelesen; erst am Ende wird sie umbenannt.
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        final_content = f"""# Jahreszusammenfassung {year}
+        header = f"""# Jahreszusammenfassung {year}
 
 Erstellt: {timestamp}
 Quellen: {len(monthly_files)} Monatszusammenfassungen
@@ -405,7 +462,8 @@ Quellen: {len(monthly_files)} Monatszusammenfassungen
 
 ## Monatsübersicht
 
-{chr(10).join(monthly_contents)}
+"""
+        footer = f"""
 
 ---
 
@@ -414,13 +472,116 @@ Dies repräsentiert die wichtigsten Ereignisse und Erkenntnisse des Jahres {year
 """
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(final_content, encoding="utf-8")
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        copied = 0
+
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write(header)
+
+            for monthly_file in sorted(monthly_files):
+                try:
+                    # Frisch erstellte Monate kommen aus dem Speicher
+                    cached = self._cached_monthly(monthly_file)
+                    if cached is not None:
+                        if copied:
+                            out.write("\n")
+                        out.write(cached)
+                        copied += 1
+                        continue
+
+                    with open(monthly_file, "r", encoding="utf-8") as src:
+                        if copied:
+                            out.write("\n")
+                        shutil.copyfileobj(src, out, 64 * 1024)
+                    copied += 1
+                except Exception as e:
+                    logger.error(f"Fehler beim Lesen von {monthly_file.name}: {e}")
+                    continue
+
+            out.write(footer)
+
+        if not copied:
+            tmp_path.unlink()
+            return False
+
+        os.replace(tmp_path, output_path)
 
         logger.info(f"Yearly Summary erstellt: {output_path.name}")
         return True
 
     # Private Hilfsmethoden
 
+    def _remember_monthly(self, path: Path, content: str):
+        """
+        Merkt sich eine gerade geschriebene Monatszusammenfassung.
+
+        Args:
+            path: Pfad der Monatsdatei
+            content: Geschriebener Inhalt
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+
+        self._monthly_cache[path] = (stat.st_mtime_ns, stat.st_size, content)
+        self._monthly_cache.move_to_end(path)
+        while len(self._monthly_cache) > self.MONTHLY_CACHE_SIZE:
+            self._monthly_cache.popitem(last=False)
+
+    def _cached_monthly(self, path: Path) -> Optional[str]:
+        """
+        Gibt den gemerkten Inhalt einer Monatsdatei zurück, solange die
+        Datei seit dem Schreiben unverändert ist.
+
+        Args:
+            path: Pfad der Monatsdatei
+
+        Returns:
+            Inhalt oder None wenn nicht (mehr) im Cache
+        """
+        entry = self._monthly_cache.get(path)
+        if entry is None:
+            return None
+
+        try:
+            stat = path.stat()
+        except OSError:
+            stat = None
+
+        if stat is None or (stat.st_mtime_ns, stat.st_size) != entry[:2]:
+            del self._monthly_cache[path]
+            return None
+
+        return entry[2]
+
+    def _read_files(self, paths: List[Path]) -> List[Tuple[Path, Optional[str]]]:
+        """
+        Liest mehrere Dateien parallel ein.
+
+        Die Lesezugriffe sind unabhängig voneinander, daher überlappen sich
+        die I/O-Wartezeiten im Thread-Pool. Die Reihenfolge bleibt erhalten.
+
+        Args:
+            paths: Liste von Dateipfaden
+
+        Returns:
+            Liste von (Pfad, Inhalt) - Inhalt ist None bei Lesefehlern
+        """
+        def read(path: Path) -> Tuple[Path, Optional[str]]:
+            try:
+                return path, path.read_text(encoding="utf-8")
+            except Exception as e:
+                logger.error(f"Fehler beim Lesen von {path.name}: {e}")
+                return path, None
+
+        if len(paths) <= 1:
+            return [read(path) for path in paths]
+
+        workers = min(self.MAX_READ_WORKERS, len(paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(read, paths))
+
     def _clean_markdown(self, text: str) -> str:
         """
         Entfernt Markdown-Formatierung für TTS-Kompatibilität.
@@ -431,18 +592,22 @@ Dies repräsentiert die wichtigsten Ereignisse und Erkenntnisse des Jahres {year
         Returns:
             Text ohne Markdown
         """
-        import re
-
         # Entferne Code-Blöcke
         if "```" in text:
-            text = re.sub(r"```[\s\S]*?```", "", text)
-
-        # Entferne Markdown-Formatierung
-        text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)  # Bold
-        text = re.sub(r"\*(.+?)\*", r"\1", text)      # Italic
-        text = re.sub(r"__(.+?)__", r"\1", text)      # Bold
-        text = re.sub(r"_(.+?)_", r"\1", text)        # Italic
-        text = re.sub(r"`(.+?)`", r"\1", text)        # Code
-        text = re.sub(r"#+\s", "", text)              # Headers
+            text = self._RE_CODE_BLOCK.sub("", text)
+
+        # Entferne Markdown-Formatierung. Jeder Durchlauf wird nur
+        # gestartet, wenn sein Trennzeichen überhaupt vorkommt - der
+        # str-Test ist ein einzelner C-Scan, der Regex-Durchlauf nicht.
+        if "*" in text:
+            text = self._RE_BOLD_STAR.sub(r"\1", text)  # Bold
+            text = self._RE_ITALIC_STAR.sub(r"\1", text)  # Italic
+        if "_" in text:
+            text = self._RE_BOLD_UNDERSCORE.sub(r"\1", text)  # Bold
+            text = self._RE_ITALIC_UNDERSCORE.sub(r"\1", text)  # Italic
+        if "`" in text:
+            text = self._RE_INLINE_CODE.sub(r"\1", text)  # Code
+        if "#" in text:
+            text = self._RE_HEADER.sub("", text)  # Headers
 
         return text.strip()
@@ -9,14 +9,28 @@ Verwaltet Tasks (automatisierte Python-Skripte) für Benutzer:
 """
 
 import os
-import hashlib
+import re
+import contextlib
+import copy
+import errno
+import functools
+import asyncio
+import threading
 import json
+import mmap
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
-from src.file_structure import FileStructureManager
+from src.file_structure import FileStructureManager, atomic_write_text
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +38,132 @@ logger = logging.getLogger(__name__)
 class TaskManager:
     """Verwaltet Tasks und Skills für Benutzer."""
 
+    # Anzahl geparster Task-Dateien im Speicher (LRU)
+    TASK_CACHE_SIZE = 1024
+
+    # Maximale Anzahl paralleler Lesezugriffe in list_tasks
+    MAX_READ_WORKERS = 8
+
+    # Abschnitts-Überschriften der Task-Markdown-Datei
+    _TASK_SECTIONS = {
+        "## Metadata": "metadata",
+        "## Description": "description",
+        "## Generated Script": "script",
+        "## Requirements": "requirements",
+        "## KI Discovery Metadata": "ki_metadata",
+    }
+
+    # Prompt-Vorlagen für das Developer-Critic-System
+    DEVELOPER_PROMPT = """Du bist ein Senior Python Developer. Erstelle ein robustes, fehlerfreies Python-Script.
+
+AUFGABE: {task_description}
+
+ANFORDERUNGEN:
+1. SYNTAX: Perfektes Python, keine f-string Fehler, keine Indentation errors
+2. STRUKTUR: Nutze main() Funktion und if __name__ == "__main__"
+3. FEHLERBEHANDLUNG: Alle externen Operationen in try/except
+4. IMPORTS: Nur Standard-Library (sys, os, urllib, json, subprocess, platform, socket)
+5. AUSGABE: Ergebnis mit print() ausgeben
+6. PARAMETER: Über sys.argv[1] lesen wenn benötigt
+
+BEISPIEL-STRUKTUR:
+```python
+import sys
+import os
+
+def main():
+    try:
+        # Dein Code hier
+        if len(sys.argv) > 1:
+            param = sys.argv[1]
+        result = "..."
+        print(result)
+    except Exception as e:
+        print(f"Fehler: {{e}}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
+```
+
+WICHTIG:
+- Schreibe KOMPLETTES, lauffähiges Script
+- Keine abgeschnittenen Strings oder f-strings
+- Korrekte Einrückung (4 Spaces)
+- Alle Strings korrekt schließen
+
+Schreibe nur den Python-Code ohne Markdown."""
+
+    IMPROVEMENT_PROMPT = """Du bist ein Senior Python Developer. Verbessere das Script basierend auf dem Feedback.
+
+AUFGABE: {task_description}
+
+KRITIK VOM CODE REVIEWER:
+{last_feedback}
+
+DEIN JOB:
+1. Analysiere das Kritik-Punkte
+2. Korrigiere ALLE genannten Fehler
+3. Stelle sicher, dass das Script syntaktisch korrekt ist
+4. Achte auf: f-string Schließung, Klammern, Indentation
+
+WICHTIGSTE REGELN:
+- Alle f-strings MÜSSEN korrekt geschlossen sein: print(f"...")
+- Keine unvollständigen Strings
+- Korrekte Exception-Handling
+- Alle imports am Anfang
+
+Schreibe nur den korrigierten Python-Code ohne Markdown."""
+
+    CRITIC_PROMPT = """Du bist ein strenger Code Reviewer. Prüfe das Python-Script.
+
+AUFGABE: {task_description}
+
+ZU PRÜFENDES SCRIPT:
+{script}
+
+PRÜFUNG:
+1. SYNTAX-FEHLER:
+   - Alle f-strings korrekt geschlossen? (print(f"...) ))
+   - Alle Klammern paarig?
+   - Korrekte Indentation?
+   - Alle Strings geschlossen?
+
+2. IMPORTS:
+   - Nur Standard-Library?
+   - Alle imports korrekt?
+
+3. LOGIK:
+   - Erfüllt Script die Aufgabe?
+   - Gibt es offensichtliche Logik-Fehler?
+
+4. AUSFÜHRUNG:
+   - Wird das Script laufen ohne Fehler?
+
+ENTSCHEIDUNG:
+- Wenn ALLES korrekt → "APPROVED: Script ist bereit für Produktion"
+- Wenn FEHLER gefunden → "NEEDS_IMPROVEMENT: <Liste der Fehler mit Lösungsvorschlägen>"
+
+Gib nur EINE Zeile zurück mit entweder APPROVED oder NEEDS_IMPROVEMENT."""
+
+    # Task-ID-Normalisierung: Umlaute ersetzen, alles außer Buchstaben und
+    # Ziffern zu einem einzelnen Unterstrich zusammenfassen
+    _UMLAUT_TABLE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+    _RE_TASK_ID_SEPARATORS = re.compile(r"[\W_]+")
+
+    # Zeichen, die in Skill-Namen nicht erlaubt sind
+    _RE_SKILL_NAME_INVALID = re.compile(r"[^\w ]+")
+
+    # Metadaten-Schlüssel -> (Feld in task_data, Konvertierung)
+    _META_FIELDS = {
+        "id": ("id", str),
+        "created": ("created", str),
+        "updated": ("updated", str),
+        "status": ("status", str),
+        "version": ("version", int),
+        "auto-execute": ("auto_execute", lambda val: val.lower() == "yes"),
+    }
+
     def __init__(self, data_dir: str = "/media/xray/NEU/Code/Crowdbot/data"):
         """
         Initialisiert den Task Manager.
@@ -34,6 +174,30 @@ class TaskManager:
         self.data_dir = data_dir
         self.file_manager = FileStructureManager(data_dir)
 
+        # Geparste Tasks: Pfad -> (mtime_ns, size, task_data)
+        self._task_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Wird bei jeder Invalidierung erhöht; ein Leser, der währenddessen
+        # geparst hat, legt sein (evtl. veraltetes) Ergebnis nicht im Cache ab
+        self._cache_generation = 0
+
+        # Serialisiert Änderungen an Task-Dateien (Aufrufe kommen über
+        # die async-Varianten aus mehreren Worker-Threads)
+        self._lock = threading.RLock()
+
+        # Status-Ordner je Task: user_id -> {task_id: "active"|"completed"|"archived"}
+        self._task_status_dirs: Dict[int, Dict[str, str]] = {}
+
+        # Verzeichnispfade je Benutzer memoisieren (reine Pfad-Berechnung)
+        self._tasks_dir = functools.lru_cache(maxsize=1024)(self.file_manager.get_tasks_dir)
+        self._skills_dir = functools.lru_cache(maxsize=1024)(self.file_manager.get_skills_dir)
+        self._status_dir = functools.lru_cache(maxsize=4096)(self._build_status_dir)
+
+    def _build_status_dir(self, user_id: int, status_dir: str) -> Path:
+        """Gibt den Status-Ordner (active, completed, archived) eines Benutzers zurück."""
+        return self._tasks_dir(user_id) / status_dir
+
     def _generate_task_id(self, user_id: int, name: str) -> str:
         """
         Generiert eine sprechende Task-ID im Snake-Case-Format.
@@ -45,21 +209,13 @@ class TaskManager:
         Returns:
             Eindeutige ID im Snake-Case-Format (z.B. "addiere_3_zahlen")
         """
-        # Konvertiere zu Snake-Case
-        task_id = name.lower()
-        # Ersetze Umlaute
-        umlaut_map = {"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"}
-        for umlaut, replacement in umlaut_map.items():
-            task_id = task_id.replace(umlaut, replacement)
-        # Nur alphanumerische Zeichen und Unterstriche
-        task_id = "".join(c if c.isalnum() or c == "_" else "_" for c in task_id)
-        # Mehrfache Unterstriche reduzieren
-        while "__" in task_id:
-            task_id = task_id.replace("__", "_")
-        # Führende/nachfolgende Unterstriche entfernen
-        task_id = task_id.strip("_")
-
-        # Prüfe auf Konflikte und füge Suffix hinzu falls nötig
+        # Konvertiere zu Snake-Case (Umlaute ersetzen, Trennzeichen zu
+        # einfachen Unterstrichen, führende/nachfolgende entfernen)
+        task_id = name.lower().translate(self._UMLAUT_TABLE)
+        task_id = self._RE_TASK_ID_SEPARATORS.sub("_", task_id).strip("_")
+
+        # Prüfe auf Konflikte und füge Suffix hinzu falls nötig (Dict-Lookups
+        # im Status-Index, der nur beim ersten Zugriff gescannt wird)
         base_id = task_id
         counter = 2
         while self._task_id_exists(user_id, task_id):
@@ -79,11 +235,11 @@ class TaskManager:
         Returns:
             True wenn ID existiert
         """
-        for status_dir in ["active", "completed", "archived"]:
-            task_file = self.file_manager.get_tasks_dir(user_id) / status_dir / f"{task_id}.md"
-            if task_file.exists():
-                return True
-        return False
+        with self._lock:
+            index = self._task_status_dirs.get(user_id)
+            if index is None:
+                index = self._task_status_dirs[user_id] = self._scan_task_status_dirs(user_id)
+            return task_id in index
 
     def create_task(
         self,
@@ -115,64 +271,69 @@ class TaskManager:
         Returns:
             Task-ID der erstellten Task
         """
-        # Stelle Struktur sicher
-        self.file_manager.ensure_v2_structure(user_id)
-
-        # Generiere Task-ID
-        task_id = self._generate_task_id(user_id, name)
-
-        # Default Metadaten
-        if metadata is None:
-            metadata = {}
-
-        default_metadata = {
-            "tags": [],
-            "category": "",
-            "input_schema": {},
-            "output_schema": {},
-            "use_cases": []
-        }
-        default_metadata.update(metadata)
-
-        # Task-Daten
-        task_data = {
-            "id": task_id,
-            "name": name,
-            "description": description,
-            "script": script,
-            "requirements": requirements or [],
-            "status": "active",
-            "auto_execute": auto_execute,
-            "created": datetime.now().isoformat(),
-            "updated": datetime.now().isoformat(),
-            "version": 1,
-            "execution_history": [],
-            "metadata": default_metadata
-        }
-
-        # Speichere Task als Markdown
-        task_file = self.file_manager.get_task_active_dir(user_id) / f"{task_id}.md"
-        self._write_task_markdown(task_file, task_data)
-
-        logger.info(f"Task erstellt: {task_id} für User {user_id}")
-        return task_id
+        with self._lock:
+            # Stelle Struktur sicher
+            self.file_manager.ensure_v2_structure(user_id)
+
+            # Generiere Task-ID
+            task_id = self._generate_task_id(user_id, name)
+
+            # Default Metadaten
+            if metadata is None:
+                metadata = {}
+
+            default_metadata = {
+                "tags": [],
+                "category": "",
+                "input_schema": {},
+                "output_schema": {},
+                "use_cases": []
+            }
+            default_metadata.update(metadata)
+
+            # Task-Daten
+            now = datetime.now().isoformat()
+            task_data = {
+                "id": task_id,
+                "name": name,
+                "description": description,
+                "script": script,
+                "requirements": requirements or [],
+                "status": "active",
+                "auto_execute": auto_execute,
+                "created": now,
+                "updated": now,
+                "version": 1,
+                "execution_history": [],
+                "metadata": default_metadata
+            }
+
+            # Speichere Task als Markdown
+            task_file = self._status_dir(user_id, "active") / f"{task_id}.md"
+            self._write_task_markdown(task_file, task_data)
+            self._set_task_status_dir(user_id, task_id, "active")
+
+            logger.info(f"Task erstellt: {task_id} für User {user_id}")
+            return task_id
 
-    def get_task(self, user_id: int, task_id: str) -> Optional[Dict]:
+    def get_task(self, user_id: int, task_id: str, include_history: bool = True) -> Optional[Dict]:
         """
         Lädt eine Task.
 
         Args:
             user_id: Telegram Benutzer-ID
             task_id: Task-ID
+            include_history: Execution History aus der .history.jsonl laden
 
         Returns:
             Task-Daten als Dictionary oder None wenn nicht gefunden
         """
-        # Suche in allen Status-Ordnern
-        for status_dir in ["active", "completed", "archived"]:
-            task_file = self.file_manager.get_tasks_dir(user_id) / status_dir / f"{task_id}.md"
-            if task_file.exists():
-                return self._read_task_markdown(task_file)
+        task_file = self._find_task_file(user_id, task_id)
+        if task_file is not None:
+            task = self._read_task_markdown(task_file)
+            if task is not None and include_history:
+                task["execution_history"] = self._read_execution_history(user_id, task_id)
+            return task
 
         logger.warning(f"Task {task_id} nicht gefunden für User {user_id}")
         return None
@@ -202,79 +363,117 @@ class TaskManager:
         Returns:
             True wenn erfolgreich
         """
-        task = self.get_task(user_id, task_id)
-        if not task:
-            logger.error(f"Task {task_id} nicht gefunden für Update")
-            return False
+        with self._lock:
+            # Dateipfad einmal bestimmen und danach weiterverwenden
+            task_file = self._find_task_file(user_id, task_id)
+            task = self._read_task_markdown(task_file) if task_file is not None else None
+            if not task:
+                logger.error(f"Task {task_id} nicht gefunden für Update")
+                return False
+
+            now = datetime.now().isoformat()
+            changed = False
+
+            # Update Status
+            if status and status != task["status"]:
+                task["status"] = status
+                changed = True
+
+                # Verschiebe Datei bei Status-Änderung
+                current_dir = task_file.parent.name
+                if status in ["completed", "archived"] and status != current_dir:
+                    if self._move_task_file(user_id, task_id, current_dir, status):
+                        task_file = self._status_dir(user_id, status) / task_file.name
+
+            # Update Script (neue Version)
+            if script and script != task.get("script", ""):
+                task["script"] = script
+                task["version"] = task.get("version", 1) + 1
+                changed = True
+
+            # Füge Execution History hinzu (angehängt an die .history.jsonl;
+            # die Task-Datei wird nur für den Zeitstempel "updated" neu geschrieben)
+            if output is not None or error is not None:
+                execution = {
+                    "timestamp": now,
+                    "status": status or task["status"],
+                    "output": output,
+                    "error": error,
+                    "execution_time": execution_time
+                }
+                self._append_execution(user_id, task_id, execution)
+                changed = True
 
-        # Update Timestamp
-        task["updated"] = datetime.now().isoformat()
-
-        # Update Status
-        if status:
-            old_status = task["status"]
-            task["status"] = status
-
-            # Verschiebe Datei bei Status-Änderung
-            if old_status != status and status in ["completed", "archived"]:
-                self._move_task_file(user_id, task_id, old_status, status)
-
-        # Update Script (neue Version)
-        if script and script != task.get("script", ""):
-            task["script"] = script
-            task["version"] = task.get("version", 1) + 1
-
-        # Füge Execution History hinzu
-        if output is not None or error is not None:
-            execution = {
-                "timestamp": datetime.now().isoformat(),
-                "status": status or task["status"],
-                "output": output,
-                "error": error,
-                "execution_time": execution_time
-            }
-            task["execution_history"].append(execution)
+            # Nichts an der Task-Datei geändert: nicht neu schreiben
+            if not changed:
+                return True
 
-        # Speichere aktualisierte Task
-        task_file = self._get_task_file_path(user_id, task_id, task["status"])
-        if task_file:
+            # Speichere aktualisierte Task
+            task["updated"] = now
             self._write_task_markdown(task_file, task)
             logger.info(f"Task {task_id} aktualisiert")
             return True
 
-        return False
-
-    def list_tasks(self, user_id: int, status: str = "active") -> List[Dict]:
+    def list_tasks(
+        self,
+        user_id: int,
+        status: str = "active",
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Dict]:
         """
         Listet Tasks nach Status auf.
 
         Args:
             user_id: Telegram Benutzer-ID
             status: Status-Filter (active, completed, archived, all)
+            fields: Nur diese Felder zurückgeben (None = vollständige Task-Daten).
+                Spart das Kopieren von Script und Execution History.
 
         Returns:
             Liste von Task-Daten
         """
-        tasks = []
-
         # Bestimme welche Ordner durchsucht werden
         if status == "all":
             dirs = ["active", "completed", "archived"]
         else:
             dirs = [status]
 
+        task_files = []
         for dir_name in dirs:
-            task_dir = self.file_manager.get_tasks_dir(user_id) / dir_name
-            if not task_dir.exists():
+            try:
+                with os.scandir(self._status_dir(user_id, dir_name)) as entries:
+                    task_files.extend(
+                        entry.path for entry in entries
+                        if entry.name.endswith(".md") and entry.is_file()
+                    )
+            except FileNotFoundError:
                 continue
 
-            for task_file in task_dir.glob("*.md"):
-                task_data = self._read_task_markdown(task_file)
-                if task_data:
-                    tasks.append(task_data)
+        # Für die Sortierung wird "created" immer mitgelesen
+        read_fields = None if fields is None else tuple(fields) + ("created",)
+
+        def read(task_file: str) -> Optional[Dict]:
+            return self._read_task_markdown(task_file, read_fields)
+
+        # Dateien parallel lesen, die Wartezeiten auf I/O überlappen sich
+        if len(task_files) > 1:
+            workers = min(self.MAX_READ_WORKERS, len(task_files))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(read, task_files))
+        else:
+            results = [read(task_file) for task_file in task_files]
+
+        tasks = [task_data for task_data in results if task_data]
+
+        # Sortiere nach Erstellungsdatum (neueste zuerst). Die Zeitstempel
+        # bleiben bewusst Strings: isoformat() aus demselben datetime.now()
+        # sortiert lexikografisch korrekt, ein Parsen ist nicht nötig.
+        tasks.sort(key=itemgetter("created"), reverse=True)
+
+        if fields is not None and "created" not in fields:
+            for task_data in tasks:
+                del task_data["created"]
 
-        # Sortiere nach Erstellungsdatum (neueste zuerst)
-        tasks.sort(key=lambda t: t.get("created", ""), reverse=True)
         return tasks
 
     def delete_task(self, user_id: int, task_id: str) -> bool:
@@ -288,12 +487,14 @@ class TaskManager:
         Returns:
             True wenn erfolgreich
         """
-        task = self.get_task(user_id, task_id)
-        if not task:
-            return False
+        with self._lock:
+            # Der Status-Ordner ergibt sich aus dem Pfad, die Datei muss
+            # dafür nicht geparst werden
+            task_file = self._find_task_file(user_id, task_id)
+            if task_file is None:
+                return False
 
-        current_status = task["status"]
-        return self._move_task_file(user_id, task_id, current_status, "archived")
+            return self._move_task_file(user_id, task_id, task_file.parent.name, "archived")
 
     def run_task(self, user_id: int, task_id: str, llm_client, user_input: str = "") -> Tuple[bool, str]:
         """
@@ -308,15 +509,14 @@ class TaskManager:
         Returns:
             (success: bool, result: str) - Erfolg und Ausgabe/Fehler
         """
-        import subprocess
-        import tempfile
-        import time
-
         # Task laden
-        task = self.get_task(user_id, task_id)
+        task = self.get_task(user_id, task_id, include_history=False)
         if not task:
             return False, f"Task {task_id} nicht gefunden"
 
+        # Neu generiertes Script wird zusammen mit dem Ergebnis gespeichert
+        new_script = None
+
         # Wenn kein Script vorhanden, generiere eines mit Multi-Agenten-System
         if not task.get("script") or task["script"].strip() == "":
             logger.info(f"Generiere Script für Task {task_id} mit Multi-Agenten-System...")
@@ -376,8 +576,8 @@ class TaskManager:
                     logger.warning("Kein Script vom Critic freigegeben, nehme letzte Version als Fallback")
                     approved_script = iteration_history[-1]['script']
 
-                # Speichere freigegebenes Script
-                self.update_task(user_id, task_id, script=approved_script)
+                # Freigegebenes Script wird mit dem Ausführungsergebnis gespeichert
+                new_script = approved_script
                 task["script"] = approved_script
                 logger.info(f"Script nach {len(iteration_history)} Developer-Critic Iterationen generiert")
 
@@ -391,7 +591,8 @@ class TaskManager:
         start_time = time.time()
 
         try:
-            # Temporäre Datei für Script
+            # Temporäre Datei für Script (__file__ und sys.argv[0] wie bei
+            # einem normalen Script-Aufruf)
             with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
                 f.write(task["script"])
                 script_path = f.name
@@ -401,19 +602,23 @@ class TaskManager:
             if user_input:
                 cmd.append(user_input)
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            try:
+                # stdin leer statt vom Bot geerbt: input() endet mit EOFError
+                # statt bis zum Timeout auf das Terminal des Bots zu warten
+                result = subprocess.run(
+                    cmd,
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+            finally:
+                # Aufräumen (auch bei Timeout oder Fehler)
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(script_path)
 
             execution_time = time.time() - start_time
 
-            # Aufräumen
-            import os
-            os.unlink(script_path)
-
             # Erfolg?
             if result.returncode == 0:
                 output = result.stdout.strip()
@@ -431,6 +636,7 @@ class TaskManager:
                     user_id,
                     task_id,
                     status="completed",
+                    script=new_script,
                     output=output,
                     execution_time=execution_time
                 )
@@ -448,6 +654,7 @@ class TaskManager:
                     user_id,
                     task_id,
                     status="active",
+                    script=new_script,
                     error=error,
                     execution_time=execution_time
                 )
@@ -456,13 +663,13 @@ class TaskManager:
 
         except subprocess.TimeoutExpired:
             error_msg = "Script-Ausführung dauert zu lange (Timeout nach 30 Sekunden)"
-            self.update_task(user_id, task_id, error=error_msg)
+            self.update_task(user_id, task_id, script=new_script, error=error_msg)
             logger.error(f"Task {task_id} Timeout")
             return False, error_msg
 
         except Exception as e:
             error_msg = f"Fehler bei Script-Ausführung: {str(e)}"
-            self.update_task(user_id, task_id, error=error_msg)
+            self.update_task(user_id, task_id, script=new_script, error=error_msg)
             logger.error(f"Task {task_id} Exception: {e}")
             return False, error_msg
 
@@ -555,11 +762,10 @@ Beispiele:
             skill_name = task["name"]
 
         # Sanitize Skill-Name
-        skill_name = "".join(c if c.isalnum() or c in "_ " else "" for c in skill_name)
-        skill_name = skill_name.replace(" ", "_").lower()
+        skill_name = self._RE_SKILL_NAME_INVALID.sub("", skill_name).replace(" ", "_").lower()
 
         # Skill-Datei
-        skills_dir = self.file_manager.get_skills_dir(user_id)
+        skills_dir = self._skills_dir(user_id)
         skill_file = skills_dir / f"{skill_name}.py"
 
         # Schreibe Skill
@@ -596,7 +802,7 @@ Beispiele:
         Returns:
             Skill-Script oder None
         """
-        skills_dir = self.file_manager.get_skills_dir(user_id)
+        skills_dir = self._skills_dir(user_id)
         skill_file = skills_dir / f"{skill_name}.py"
 
         if not skill_file.exists():
@@ -631,21 +837,15 @@ Beispiele:
             skill_name = skill_file.stem
 
             try:
-                with open(skill_file, "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                    # Extrahiere Docstring
+                description = self._read_skill_docstring(skill_file)
+                if description is None:
                     description = "Keine Beschreibung"
-                    if '"""' in content:
-                        parts = content.split('"""')
-                        if len(parts) >= 3:
-                            description = parts[1].strip()
-
-                    skills.append({
-                        "name": skill_name,
-                        "file": str(skill_file),
-                        "description": description
-                    })
+
+                skills.append({
+                    "name": skill_name,
+                    "file": str(skill_file),
+                    "description": description
+                })
 
             except Exception as e:
                 logger.error(f"Fehler beim Lesen von Skill {skill_name}: {e}")
@@ -653,92 +853,207 @@ Beispiele:
 
         return skills
 
+    @staticmethod
+    def _read_skill_docstring(skill_file: Path) -> Optional[str]:
+        """
+        Extrahiert den Docstring-Header eines Skills.
+
+        Die Datei wird per mmap eingeblendet und nur nach den ersten beiden
+        Anführungszeichen-Tripeln durchsucht, das restliche Script wird nicht
+        in den Speicher kopiert.
+
+        Args:
+            skill_file: Pfad zur Skill-Datei
+
+        Returns:
+            Docstring ohne umgebende Leerzeichen oder None
+        """
+        with open(skill_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = mm.find(b'"""')
+                if start == -1:
+                    return None
+                end = mm.find(b'"""', start + 3)
+                if end == -1:
+                    return None
+                return mm[start + 3:end].decode("utf-8").strip()
+
+    # Asynchrone Varianten für den Bot (blockieren die Event-Loop nicht)
+
+    async def acreate_task(self, user_id: int, name: str, description: str, **kwargs) -> str:
+        """Asynchrone Variante von create_task()."""
+        return await asyncio.to_thread(self.create_task, user_id, name, description, **kwargs)
+
+    async def aget_task(self, user_id: int, task_id: str) -> Optional[Dict]:
+        """Asynchrone Variante von get_task()."""
+        return await asyncio.to_thread(self.get_task, user_id, task_id)
+
+    async def alist_tasks(
+        self,
+        user_id: int,
+        status: str = "active",
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Dict]:
+        """Asynchrone Variante von list_tasks()."""
+        return await asyncio.to_thread(self.list_tasks, user_id, status, fields)
+
+    async def adelete_task(self, user_id: int, task_id: str) -> bool:
+        """Asynchrone Variante von delete_task()."""
+        return await asyncio.to_thread(self.delete_task, user_id, task_id)
+
+    async def arun_task(self, user_id: int, task_id: str, llm_client, user_input: str = "") -> Tuple[bool, str]:
+        """Asynchrone Variante von run_task()."""
+        return await asyncio.to_thread(self.run_task, user_id, task_id, llm_client, user_input)
+
     # Hilfsfunktionen
 
     def _write_task_markdown(self, file_path: Path, task_data: Dict):
         """Schreibt Task-Daten als Markdown."""
-        with open(file_path, "w", encoding="utf-8") as f:
-            # Header
-            f.write(f"# Task: {task_data['name']}\n\n")
-
-            # Metadata
-            f.write("## Metadata\n\n")
-            f.write(f"- ID: {task_data['id']}\n")
-            f.write(f"- Created: {task_data['created']}\n")
-            f.write(f"- Updated: {task_data['updated']}\n")
-            f.write(f"- Status: {task_data['status']}\n")
-            f.write(f"- Version: {task_data.get('version', 1)}\n")
-            f.write(f"- Auto-Execute: {'yes' if task_data.get('auto_execute') else 'no'}\n\n")
-
-            # KI Discovery Metadata
-            metadata = task_data.get("metadata", {})
-            if metadata.get("tags") or metadata.get("category"):
-                f.write("## KI Discovery Metadata\n\n")
-
-                if metadata.get("category"):
-                    f.write(f"- Category: {metadata['category']}\n")
-
-                if metadata.get("tags"):
-                    f.write(f"- Tags: {', '.join(metadata['tags'])}\n")
-
-                if metadata.get("input_schema"):
-                    f.write(f"- Input Schema: ```json\n{json.dumps(metadata['input_schema'], indent=2, ensure_ascii=False)}\n```\n")
-
-                if metadata.get("output_schema"):
-                    f.write(f"- Output Schema: ```json\n{json.dumps(metadata['output_schema'], indent=2, ensure_ascii=False)}\n```\n")
-
-                if metadata.get("use_cases"):
-                    f.write("\n**Use Cases:**\n")
-                    for use_case in metadata["use_cases"]:
-                        f.write(f"- {use_case}\n")
-
-                f.write("\n")
-
-            # Description
-            f.write("## Description\n\n")
-            f.write(f"{task_data['description']}\n\n")
-
-            # Requirements
-            if task_data.get("requirements"):
-                f.write("## Requirements\n\n")
-                f.write(", ".join(task_data["requirements"]) + "\n\n")
-
-            # Script
-            f.write("## Generated Script\n\n")
-            f.write("```python\n")
-            f.write(task_data.get("script", "# Kein Script vorhanden\n"))
-            f.write("\n```\n\n")
-
-            # Execution History
-            f.write("## Execution History\n\n")
-            if not task_data.get("execution_history"):
-                f.write("*Noch keine Ausführungen*\n\n")
-            else:
-                for i, execution in enumerate(task_data["execution_history"], 1):
-                    f.write(f"### Execution {i} ({execution['timestamp']})\n\n")
-                    f.write(f"- Status: {execution['status']}\n")
-                    if execution.get("execution_time"):
-                        f.write(f"- Duration: {execution['execution_time']:.2f}s\n")
-
-                    if execution.get("output"):
-                        f.write("\n**Output:**\n```\n")
-                        f.write(execution["output"])
-                        f.write("\n```\n\n")
-
-                    if execution.get("error"):
-                        f.write("\n**Error:**\n```\n")
-                        f.write(execution["error"])
-                        f.write("\n```\n\n")
-
-    def _read_task_markdown(self, file_path: Path) -> Optional[Dict]:
-        """Liest Task-Daten aus Markdown."""
+        # Erst komplett im Speicher aufbauen, dann in einem Schritt atomar schreiben
+        parts = []
+        write = parts.append
+
+        # Header
+        write(f"# Task: {task_data['name']}\n\n")
+
+        # Metadata
+        write("## Metadata\n\n")
+        write(f"- ID: {task_data['id']}\n")
+        write(f"- Created: {task_data['created']}\n")
+        write(f"- Updated: {task_data['updated']}\n")
+        write(f"- Status: {task_data['status']}\n")
+        write(f"- Version: {task_data.get('version', 1)}\n")
+        write(f"- Auto-Execute: {'yes' if task_data.get('auto_execute') else 'no'}\n\n")
+
+        # KI Discovery Metadata
+        metadata = task_data.get("metadata", {})
+        if metadata.get("tags") or metadata.get("category"):
+            write("## KI Discovery Metadata\n\n")
+
+            if metadata.get("category"):
+                write(f"- Category: {metadata['category']}\n")
+
+            if metadata.get("tags"):
+                write(f"- Tags: {', '.join(metadata['tags'])}\n")
+
+            if metadata.get("input_schema"):
+                write(f"- Input Schema: ```json\n{json.dumps(metadata['input_schema'], indent=2, ensure_ascii=False)}\n```\n")
+
+            if metadata.get("output_schema"):
+                write(f"- Output Schema: ```json\n{json.dumps(metadata['output_schema'], indent=2, ensure_ascii=False)}\n```\n")
+
+            if metadata.get("use_cases"):
+                write("\n**Use Cases:**\n")
+                for use_case in metadata["use_cases"]:
+                    write(f"- {use_case}\n")
+
+            write("\n")
+
+        # Description
+        write("## Description\n\n")
+        write(f"{task_data['description']}\n\n")
+
+        # Requirements
+        if task_data.get("requirements"):
+            write("## Requirements\n\n")
+            write(", ".join(task_data["requirements"]) + "\n\n")
+
+        # Script
+        write("## Generated Script\n\n")
+        write("```python\n")
+        write(task_data.get("script", "# Kein Script vorhanden\n"))
+        write("\n```\n\n")
+
+        atomic_write_text(file_path, "".join(parts))
+        self._invalidate_task_cache(file_path)
+
+    def _invalidate_task_cache(self, *file_paths: Union[Path, str]):
+        """Entfernt Cache-Einträge, nachdem die Dateien ersetzt oder verschoben wurden."""
+        with self._cache_lock:
+            self._cache_generation += 1
+            for file_path in file_paths:
+                self._task_cache.pop(os.fspath(file_path), None)
+
+    def _get_history_path(self, user_id: int, task_id: str) -> Path:
+        """Gibt den Pfad der Execution History (unabhängig vom Status-Ordner) zurück."""
+        return self._tasks_dir(user_id) / f"{task_id}.history.jsonl"
+
+    def _append_execution(self, user_id: int, task_id: str, execution: Dict):
+        """Hängt eine Ausführung als JSON-Zeile an die Execution History an."""
+        with open(self._get_history_path(user_id, task_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(execution, ensure_ascii=False) + "\n")
+
+    def _read_execution_history(self, user_id: int, task_id: str) -> List[Dict]:
+        """Liest die Execution History einer Task (leer wenn keine vorhanden)."""
+        history = []
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            with open(self._get_history_path(user_id, task_id), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        history.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return history
+
+    def _read_task_markdown(
+        self,
+        file_path: Union[Path, str],
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[Dict]:
+        """
+        Liest Task-Daten aus Markdown.
+
+        Unveränderte Dateien (gleiche mtime und Größe) werden nicht erneut
+        geparst, sondern aus dem Cache als Kopie zurückgegeben.
+
+        Args:
+            file_path: Pfad zur Task-Datei
+            fields: Nur diese Felder kopieren (None = alle)
+        """
+        key = os.fspath(file_path)
+
+        with self._cache_lock:
+            generation = self._cache_generation
+
+        try:
+            st = os.stat(key)
+        except OSError as e:
+            with self._cache_lock:
+                self._task_cache.pop(key, None)
+            logger.error(f"Fehler beim Lesen von Task {file_path}: {e}")
+            return None
+
+        with self._cache_lock:
+            cached = self._task_cache.get(key)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                self._task_cache.move_to_end(key)
+                return self._copy_task(cached[2], fields)
+
+        task_data = self._parse_task_markdown(file_path)
+        if task_data is None:
+            return None
 
-            # Parse Markdown (einfaches Parsing)
-            lines = content.split("\n")
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._task_cache[key] = (st.st_mtime_ns, st.st_size, task_data)
+                self._task_cache.move_to_end(key)
+                if len(self._task_cache) > self.TASK_CACHE_SIZE:
+                    self._task_cache.popitem(last=False)
 
+        return self._copy_task(task_data, fields)
+
+    @staticmethod
+    def _copy_task(task_data: Dict, fields: Optional[Tuple[str, ...]] = None) -> Dict:
+        """Kopiert (ausgewählte Felder der) Task-Daten, damit Aufrufer den Cache nicht verändern."""
+        if fields is None:
+            return copy.deepcopy(task_data)
+        return {field: copy.deepcopy(task_data[field]) for field in fields if field in task_data}
+
+    def _parse_task_markdown(self, file_path: Union[Path, str]) -> Optional[Dict]:
+        """Parst eine Task-Datei im Markdown-Format."""
+        try:
             task_data = {
                 "id": "",
                 "name": "",
@@ -760,176 +1075,114 @@ Beispiele:
                 }
             }
 
-            # Parse Header (# Task: Name)
-            for line in lines:
-                if line.startswith("# Task:"):
-                    task_data["name"] = line.replace("# Task:", "").strip()
-                    break
+            # Datei zeilenweise lesen und jede Zeile direkt ihrem Abschnitt
+            # zuordnen - nur Zeilen der ausgewerteten Abschnitte werden
+            # behalten. Jede mit "##" beginnende Zeile beendet den aktuellen
+            # Abschnitt.
+            sections = {section: [] for section in self._TASK_SECTIONS.values()}
+            current = None
+            name_found = False
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+
+                    if line.startswith("##"):
+                        current = None
+                        for prefix, section in self._TASK_SECTIONS.items():
+                            if line.startswith(prefix):
+                                current = section
+                                break
+                        continue
 
-            # Parse Metadata
-            in_metadata = False
-            for line in lines:
-                if line.startswith("## Metadata"):
-                    in_metadata = True
-                    continue
-                elif line.startswith("##"):
-                    in_metadata = False
+                    if current is not None:
+                        sections[current].append(line)
 
-                if in_metadata and line.strip().startswith("-"):
+                    # Parse Header (# Task: Name)
+                    if not name_found and line.startswith("# Task:"):
+                        task_data["name"] = line.replace("# Task:", "").strip()
+                        name_found = True
+
+            # Parse Metadata
+            for line in sections["metadata"]:
+                if line.strip().startswith("-"):
                     key_val = line.strip().lstrip("- ").split(":", 1)
                     if len(key_val) == 2:
                         key, val = key_val
-                        key = key.strip().lower()
-                        val = val.strip()
-
-                        if key == "id":
-                            task_data["id"] = val
-                        elif key == "created":
-                            task_data["created"] = val
-                        elif key == "updated":
-                            task_data["updated"] = val
-                        elif key == "status":
-                            task_data["status"] = val
-                        elif key == "version":
-                            task_data["version"] = int(val)
-                        elif key == "auto-execute":
-                            task_data["auto_execute"] = val.lower() == "yes"
+                        meta_field = self._META_FIELDS.get(key.strip().lower())
+                        if meta_field:
+                            field, convert = meta_field
+                            task_data[field] = convert(val.strip())
 
             # Parse Description
-            desc_lines = []
-            in_desc = False
-            for line in lines:
-                if line.startswith("## Description"):
-                    in_desc = True
-                    continue
-                elif line.startswith("##"):
-                    in_desc = False
-
-                if in_desc and line.strip():
-                    desc_lines.append(line)
-
+            desc_lines = [line for line in sections["description"] if line.strip()]
             task_data["description"] = "\n".join(desc_lines).strip()
 
             # Parse Script
             script_lines = []
-            in_script = False
-            for line in lines:
-                if line.startswith("## Generated Script"):
-                    in_script = True
+            for line in sections["script"]:
+                if line.strip() == "```python":
                     continue
-                elif line.startswith("##"):
-                    in_script = False
-
-                if in_script:
-                    if line.strip() == "```python":
-                        continue
-                    elif line.strip() == "```":
-                        break
-                    else:
-                        script_lines.append(line)
+                elif line.strip() == "```":
+                    break
+                else:
+                    script_lines.append(line)
 
             task_data["script"] = "\n".join(script_lines).strip()
 
             # Parse Requirements
-            req_lines = []
-            in_req = False
-            for line in lines:
-                if line.startswith("## Requirements"):
-                    in_req = True
-                    continue
-                elif line.startswith("##"):
-                    in_req = False
-
-                if in_req and line.strip():
-                    req_lines.append(line.strip())
-
+            req_lines = [line.strip() for line in sections["requirements"] if line.strip()]
             if req_lines:
                 # Comma-separated
                 task_data["requirements"] = [r.strip() for r in req_lines[0].split(",")]
 
             # Parse KI Discovery Metadata
-            in_ki_meta = False
-            ki_meta_content = []
-            for line in lines:
-                if line.startswith("## KI Discovery Metadata"):
-                    in_ki_meta = True
-                    continue
-                elif line.startswith("##"):
-                    in_ki_meta = False
+            ki_meta_content = sections["ki_metadata"]
 
-                if in_ki_meta:
-                    ki_meta_content.append(line)
-
-            # Parse KI Metadata Fields
+            # Parse KI Metadata Fields (ein Durchlauf für alle Felder)
             if ki_meta_content:
-                content_str = "\n".join(ki_meta_content)
-
-                # Parse Category
-                if "- Category:" in content_str:
-                    for line in ki_meta_content:
-                        if line.strip().startswith("- Category:"):
-                            task_data["metadata"]["category"] = line.split(":", 1)[1].strip()
-
-                # Parse Tags
-                if "- Tags:" in content_str:
-                    for line in ki_meta_content:
-                        if line.strip().startswith("- Tags:"):
-                            tags_str = line.split(":", 1)[1].strip()
-                            task_data["metadata"]["tags"] = [t.strip() for t in tags_str.split(",")]
-
-                # Parse Input Schema (JSON)
-                if "- Input Schema:" in content_str:
-                    try:
-                        schema_start = False
-                        schema_lines = []
-                        for line in ki_meta_content:
-                            if "- Input Schema:" in line:
-                                schema_start = True
-                                continue
-                            if schema_start:
-                                if line.strip() == "```":
-                                    break
-                                if line.strip().startswith("```json"):
-                                    continue
-                                if line.strip().startswith("- "):
-                                    break
-                                schema_lines.append(line)
-                        if schema_lines:
-                            task_data["metadata"]["input_schema"] = json.loads("\n".join(schema_lines))
-                    except Exception as e:
-                        logger.warning(f"Fehler beim Parsen von Input Schema: {e}")
-
-                # Parse Output Schema (JSON)
-                if "- Output Schema:" in content_str:
-                    try:
-                        schema_start = False
-                        schema_lines = []
-                        for line in ki_meta_content:
-                            if "- Output Schema:" in line:
-                                schema_start = True
-                                continue
-                            if schema_start:
-                                if line.strip() == "```":
-                                    break
-                                if line.strip().startswith("```json"):
-                                    continue
-                                if line.strip().startswith("- "):
-                                    break
-                                schema_lines.append(line)
-                        if schema_lines:
-                            task_data["metadata"]["output_schema"] = json.loads("\n".join(schema_lines))
-                    except Exception as e:
-                        logger.warning(f"Fehler beim Parsen von Output Schema: {e}")
-
-                # Parse Use Cases
+                metadata = task_data["metadata"]
+                # Schema-Zustand: [Überschrift, begonnen, beendet, Zeilen]
+                schemas = {
+                    "input_schema": ["- Input Schema:", False, False, []],
+                    "output_schema": ["- Output Schema:", False, False, []],
+                }
                 use_case_start = False
+
                 for line in ki_meta_content:
+                    stripped = line.strip()
+
+                    if stripped.startswith("- Category:"):
+                        metadata["category"] = line.split(":", 1)[1].strip()
+                    elif stripped.startswith("- Tags:"):
+                        tags_str = line.split(":", 1)[1].strip()
+                        metadata["tags"] = [t.strip() for t in tags_str.split(",")]
+
+                    # JSON-Schemas: Zeilen nach der Überschrift bis ``` bzw. "- "
+                    for state in schemas.values():
+                        if state[2]:
+                            continue
+                        if state[0] in line:
+                            state[1] = True
+                            continue
+                        if state[1]:
+                            if stripped == "```" or stripped.startswith("- "):
+                                state[2] = True
+                            elif not stripped.startswith("```json"):
+                                state[3].append(line)
+
+                    # Use Cases
                     if "**Use Cases:**" in line:
                         use_case_start = True
-                        continue
-                    if use_case_start and line.strip().startswith("- "):
-                        use_case = line.strip().lstrip("- ")
-                        task_data["metadata"]["use_cases"].append(use_case)
+                    elif use_case_start and stripped.startswith("- "):
+                        metadata["use_cases"].append(stripped.lstrip("- "))
+
+                for key, (marker, _, _, schema_lines) in schemas.items():
+                    if schema_lines:
+                        try:
+                            metadata[key] = json.loads("\n".join(schema_lines))
+                        except Exception as e:
+                            name = marker.strip("- :")
+                            logger.warning(f"Fehler beim Parsen von {name}: {e}")
 
             return task_data
 
@@ -937,13 +1190,81 @@ Beispiele:
             logger.error(f"Fehler beim Lesen von Task {file_path}: {e}")
             return None
 
-    def _get_task_file_path(self, user_id: int, task_id: str, status: str) -> Optional[Path]:
-        """Gibt den Pfad zur Task-Datei zurück basierend auf Status."""
-        if status not in ["active", "completed", "archived"]:
-            status = "active"
+    def _scan_task_status_dirs(self, user_id: int) -> Dict[str, str]:
+        """
+        Ermittelt für alle Tasks eines Benutzers den Status-Ordner.
+
+        Liegt eine Task-ID in mehreren Ordnern, gilt wie bisher die
+        Reihenfolge active, completed, archived.
+
+        Returns:
+            Dict mit Task-ID als Key und Ordnername als Value
+        """
+        index = {}
+
+        for status_dir in ["active", "completed", "archived"]:
+            try:
+                with os.scandir(self._status_dir(user_id, status_dir)) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".md"):
+                            index.setdefault(entry.name[:-3], status_dir)
+            except FileNotFoundError:
+                continue
+
+        return index
+
+    def _find_task_file(self, user_id: int, task_id: str) -> Optional[Path]:
+        """
+        Findet die Datei einer Task über den Status-Index im Speicher.
+
+        Statt bei jedem Aufruf bis zu drei Ordner zu prüfen, wird der Ordner
+        aus dem Index gelesen. Nur ein veralteter Eintrag (z.B. extern
+        verschobene Datei) baut den Index neu auf; unbekannte IDs werden bei
+        einem älteren Index wie bisher direkt in den drei Ordnern gesucht.
+
+        Returns:
+            Pfad zur Task-Datei oder None wenn nicht gefunden
+        """
+        with self._lock:
+            index = self._task_status_dirs.get(user_id)
+            fresh = index is None
+            if fresh:
+                index = self._task_status_dirs[user_id] = self._scan_task_status_dirs(user_id)
+            status_dir = index.get(task_id)
+
+        if status_dir is not None:
+            task_file = self._status_dir(user_id, status_dir) / f"{task_id}.md"
+            if task_file.exists():
+                return task_file
+            if fresh:
+                return None
+
+            # Veralteter Eintrag: Index einmal neu aufbauen
+            with self._lock:
+                index = self._task_status_dirs[user_id] = self._scan_task_status_dirs(user_id)
+                status_dir = index.get(task_id)
+
+            return self._status_dir(user_id, status_dir) / f"{task_id}.md" if status_dir else None
+
+        # Gerade gescannt: die Task existiert nicht
+        if fresh:
+            return None
+
+        # Unbekannt in einem älteren Index: evtl. extern angelegt
+        for status_dir in ["active", "completed", "archived"]:
+            task_file = self._status_dir(user_id, status_dir) / f"{task_id}.md"
+            if task_file.exists():
+                self._set_task_status_dir(user_id, task_id, status_dir)
+                return task_file
 
-        task_file = self.file_manager.get_tasks_dir(user_id) / status / f"{task_id}.md"
-        return task_file if task_file.exists() else None
+        return None
+
+    def _set_task_status_dir(self, user_id: int, task_id: str, status_dir: str):
+        """Trägt den Status-Ordner einer Task in den Index ein (falls geladen)."""
+        with self._lock:
+            index = self._task_status_dirs.get(user_id)
+            if index is not None:
+                index[task_id] = status_dir
 
     def _move_task_file(
         self,
@@ -953,89 +1274,38 @@ Beispiele:
         to_status: str
     ) -> bool:
         """Verschiebt eine Task-Datei zwischen Status-Ordnern."""
-        source = self.file_manager.get_tasks_dir(user_id) / from_status / f"{task_id}.md"
-        dest = self.file_manager.get_tasks_dir(user_id) / to_status / f"{task_id}.md"
-
-        if not source.exists():
-            logger.error(f"Quelldatei {source} existiert nicht")
-            return False
+        source = self._status_dir(user_id, from_status) / f"{task_id}.md"
+        dest = self._status_dir(user_id, to_status) / f"{task_id}.md"
 
         try:
-            # Verschiebe Datei
-            import shutil
-            shutil.move(str(source), str(dest))
+            with self._lock:
+                try:
+                    # Gleiches Dateisystem: ein einzelner rename()-Aufruf
+                    os.replace(source, dest)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(os.fspath(source), os.fspath(dest))
+            self._invalidate_task_cache(source, dest)
+            self._set_task_status_dir(user_id, task_id, to_status)
             logger.info(f"Task {task_id} verschoben: {from_status} → {to_status}")
             return True
+        except FileNotFoundError:
+            logger.error(f"Quelldatei {source} existiert nicht")
+            return False
         except Exception as e:
             logger.error(f"Fehler beim Verschieben von Task {task_id}: {e}")
             return False
 
     def _build_developer_prompt(self, task_description: str, iteration_history: list) -> str:
         """Erstellt Prompt für Developer-Agent (Script-Generierung)."""
-        return f"""Du bist ein Senior Python Developer. Erstelle ein robustes, fehlerfreies Python-Script.
-
-AUFGABE: {task_description}
-
-ANFORDERUNGEN:
-1. SYNTAX: Perfektes Python, keine f-string Fehler, keine Indentation errors
-2. STRUKTUR: Nutze main() Funktion und if __name__ == "__main__"
-3. FEHLERBEHANDLUNG: Alle externen Operationen in try/except
-4. IMPORTS: Nur Standard-Library (sys, os, urllib, json, subprocess, platform, socket)
-5. AUSGABE: Ergebnis mit print() ausgeben
-6. PARAMETER: Über sys.argv[1] lesen wenn benötigt
-
-BEISPIEL-STRUKTUR:
-```python
-import sys
-import os
-
-def main():
-    try:
-        # Dein Code hier
-        if len(sys.argv) > 1:
-            param = sys.argv[1]
-        result = "..."
-        print(result)
-    except Exception as e:
-        print(f"Fehler: {{e}}")
-        sys.exit(1)
-
-if __name__ == "__main__":
-    main()
-```
-
-WICHTIG:
-- Schreibe KOMPLETTES, lauffähiges Script
-- Keine abgeschnittenen Strings oder f-strings
-- Korrekte Einrückung (4 Spaces)
-- Alle Strings korrekt schließen
-
-Schreibe nur den Python-Code ohne Markdown."""
+        return self.DEVELOPER_PROMPT.format(task_description=task_description)
 
     def _build_improvement_prompt(self, task_description: str, iteration_history: list) -> str:
         """Erstellt Prompt für Developer-Agent (Script-Verbesserung basierend auf Critic-Feedback)."""
         last_feedback = iteration_history[-1]['critic_feedback']
 
-        return f"""Du bist ein Senior Python Developer. Verbessere das Script basierend auf dem Feedback.
-
-AUFGABE: {task_description}
-
-KRITIK VOM CODE REVIEWER:
-{last_feedback}
-
-DEIN JOB:
-1. Analysiere das Kritik-Punkte
-2. Korrigiere ALLE genannten Fehler
-3. Stelle sicher, dass das Script syntaktisch korrekt ist
-4. Achte auf: f-string Schließung, Klammern, Indentation
-
-WICHTIGSTE REGELN:
-- Alle f-strings MÜSSEN korrekt geschlossen sein: print(f"...")
-- Keine unvollständigen Strings
-- Korrekte Exception-Handling
-- Alle imports am Anfang
-
-Schreibe nur den korrigierten Python-Code ohne Markdown."""
+        return self.IMPROVEMENT_PROMPT.format(task_description=task_description, last_feedback=last_feedback)
 
     def _critic_script(self, llm_client, task_description: str, script: str) -> dict:
         """
@@ -1044,36 +1314,7 @@ Schreibe nur den korrigierten Python-Code ohne Markdown."""
         Returns:
             dict with 'status' ('APPROVED' or 'NEEDS_IMPROVEMENT') and 'feedback' (str)
         """
-        critic_prompt = f"""Du bist ein strenger Code Reviewer. Prüfe das Python-Script.
-
-AUFGABE: {task_description}
-
-ZU PRÜFENDES SCRIPT:
-{script}
-
-PRÜFUNG:
-1. SYNTAX-FEHLER:
-   - Alle f-strings korrekt geschlossen? (print(f"...) ))
-   - Alle Klammern paarig?
-   - Korrekte Indentation?
-   - Alle Strings geschlossen?
-
-2. IMPORTS:
-   - Nur Standard-Library?
-   - Alle imports korrekt?
-
-3. LOGIK:
-   - Erfüllt Script die Aufgabe?
-   - Gibt es offensichtliche Logik-Fehler?
-
-4. AUSFÜHRUNG:
-   - Wird das Script laufen ohne Fehler?
-
-ENTSCHEIDUNG:
-- Wenn ALLES korrekt → "APPROVED: Script ist bereit für Produktion"
-- Wenn FEHLER gefunden → "NEEDS_IMPROVEMENT: <Liste der Fehler mit Lösungsvorschlägen>"
-
-Gib nur EINE Zeile zurück mit entweder APPROVED oder NEEDS_IMPROVEMENT."""
+        critic_prompt = self.CRITIC_PROMPT.format(task_description=task_description, script=script)
 
         try:
             response = llm_client.chat(user_message=critic_prompt, max_tokens=200).strip()
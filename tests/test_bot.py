@@ -0,0 +1,91 @@
+"""
+Tests für die Update-Verarbeitung des Crowdbot
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from telegram import Update, User, Message
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.bot import Crowdbot
+
+
+@pytest.fixture
+def bot():
+    """Erstellt einen Crowdbot mit temporärem Datenverzeichnis."""
+    temp_dir = tempfile.mkdtemp()
+    with patch.dict(os.environ, {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "ALLOWED_USER_IDS": "111,222"
+    }):
+        yield Crowdbot(data_dir=temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+def make_update(user_id: int, text: str):
+    """Erstellt ein Mock-Update für eine Textnachricht."""
+    message = MagicMock(spec=Message)
+    message.text = text
+    message.reply_text = AsyncMock()
+    message.chat = MagicMock()
+    message.chat.send_action = AsyncMock()
+
+    update = MagicMock(spec=Update)
+    update.effective_user = User(id=user_id, first_name="Test", is_bot=False)
+    update.message = message
+    return update
+
+
+def record_appends(bot, events):
+    """Ersetzt aappend_message durch eine langsame Variante, die Aufrufe protokolliert."""
+    async def slow_append(user_id, role, content):
+        events.append((user_id, role, content))
+        await asyncio.sleep(0.05)
+
+    bot.memory_manager.user_exists = MagicMock(return_value=True)
+    bot.memory_manager.aappend_message = slow_append
+    bot.memory_manager.aget_context = AsyncMock(return_value=[])
+    bot._load_important_files = MagicMock(return_value="")
+    bot.llm_client.achat_with_intention = AsyncMock(side_effect=lambda **kwargs: "Antwort")
+
+
+@pytest.mark.asyncio
+async def test_updates_of_same_user_are_serialized(bot):
+    """Test: Zwei Nachrichten desselben Benutzers werden nacheinander bearbeitet."""
+    events = []
+    record_appends(bot, events)
+
+    with patch.dict(os.environ, {"ALLOWED_USER_IDS": "111,222"}):
+        await asyncio.gather(
+            bot.handle_message(make_update(111, "erste"), MagicMock()),
+            bot.handle_message(make_update(111, "zweite"), MagicMock()),
+        )
+
+    assert events == [
+        (111, "user", "erste"),
+        (111, "assistant", "Antwort"),
+        (111, "user", "zweite"),
+        (111, "assistant", "Antwort"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_updates_of_different_users_run_in_parallel(bot):
+    """Test: Nachrichten verschiedener Benutzer blockieren sich nicht gegenseitig."""
+    events = []
+    record_appends(bot, events)
+
+    with patch.dict(os.environ, {"ALLOWED_USER_IDS": "111,222"}):
+        await asyncio.gather(
+            bot.handle_message(make_update(111, "von 111"), MagicMock()),
+            bot.handle_message(make_update(222, "von 222"), MagicMock()),
+        )
+
+    # Beide Benutzer-Nachrichten werden gespeichert, bevor eine Antwort kommt
+    assert [role for _, role, _ in events[:2]] == ["user", "user"]
@@ -84,3 +84,57 @@ def test_default_values(llm_client):
     """Testet Default-Werte."""
     assert llm_client.proxy_url == "https://glmproxy.ccpn.cc/v1/messages"
     assert llm_client.model_name == "glm-4.7"
+
+
+@patch("src.llm_client.requests.post")
+def test_analyze_intention_extracts_first_array(mock_post, llm_client):
+    """Testet, dass nur das erste JSON-Array aus der Antwort geparst wird."""
+    llm_client.register_tool("web_search", lambda query: query, "Internetsuche")
+
+    mock_response = Mock()
+    mock_response.json.return_value = {
+        "content": [
+            {"type": "text", "text": (
+                'Hinweis [intern]: [{"tool": "web_search", "parameters": {"query": "Wetter"}}]\n'
+                'Alternativ: []'
+            )}
+        ]
+    }
+    mock_response.raise_for_status = Mock()
+    mock_post.return_value = mock_response
+
+    tool_calls = llm_client._analyze_intention("Wie ist das Wetter?")
+
+    assert tool_calls == [{"tool": "web_search", "parameters": {"query": "Wetter"}}]
+
+
+@patch("src.llm_client.requests.post")
+def test_achat_runs_sync_chat(mock_post, llm_client):
+    """Testet, dass achat() das Ergebnis von chat() liefert."""
+    import asyncio
+
+    mock_response = Mock()
+    mock_response.json.return_value = {
+        "content": [{"type": "text", "text": "Asynchrone Antwort"}]
+    }
+    mock_response.raise_for_status = Mock()
+    mock_post.return_value = mock_response
+
+    result = asyncio.run(llm_client.achat("Hallo"))
+
+    assert result == "Asynchrone Antwort"
+    mock_post.assert_called_once()
+
+
+def test_execute_tool_call_rejects_invalid_parameters(llm_client):
+    """Testet, dass falsche Parameter vor dem Tool-Aufruf abgelehnt werden."""
+    calls = []
+    llm_client.register_tool("web_search", lambda query: calls.append(query), "Internetsuche")
+
+    result = llm_client._execute_tool_call("web_search", {"q": "Wetter"})
+    assert result.startswith("Fehler: Ungültige Parameter für web_search")
+
+    result = llm_client._execute_tool_call("web_search", ["Wetter"])
+    assert result.startswith("Fehler: Ungültige Parameter für web_search")
+
+    assert calls == []
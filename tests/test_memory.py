@@ -112,3 +112,23 @@ def test_user_without_username(temp_memory_manager):
 
     assert result is True
     assert temp_memory_manager.user_exists(user_id) is True
+
+
+def test_context_cache_invalidation(temp_memory_manager):
+    """Testet, dass der Kontext-Cache bei Dateiänderungen neu lädt."""
+    user_id = 12345
+
+    temp_memory_manager.create_user(user_id)
+    temp_memory_manager.append_message(user_id, "user", "Erste Nachricht")
+
+    assert len(temp_memory_manager.get_context(user_id)) == 1
+    assert user_id in temp_memory_manager._ctx_cache
+
+    # Externe Änderung der Datei muss erkannt werden
+    memory_path = temp_memory_manager._get_memory_path(user_id)
+    with open(memory_path, "a", encoding="utf-8") as f:
+        f.write("\n### Crowdbot - 2026-01-01 12:00:00\n\nExterne Antwort\n\n---\n")
+
+    context = temp_memory_manager.get_context(user_id)
+    assert len(context) == 2
+    assert context[1]["content"] == "Externe Antwort"
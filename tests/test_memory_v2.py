@@ -10,11 +10,13 @@ Testet die Kernfunktionalität des hierarchischen Memory-Systems:
 - ContextLoader
 """
 
+import os
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from src.file_structure import FileStructureManager
 from src.memory_manager_v2 import MemoryManagerV2
@@ -210,6 +212,154 @@ def test_get_context_v2(memory_manager):
     assert messages[2]["role"] == "user"
 
 
+def test_get_context_tail_read_v2(memory_manager, file_structure):
+    """Test: Kontext wird aus dem Dateiende gelesen und bleibt chronologisch."""
+    user_id = 12345
+    memory_manager.create_user(user_id)
+    memory_manager.CONTEXT_TAIL_BYTES = 256
+
+    for i in range(30):
+        memory_manager.append_message(user_id, "user", f"Frage {i}")
+        memory_manager.append_message(user_id, "assistant", f"Antwort {i}")
+
+    messages = memory_manager.get_context(user_id, max_messages=3)
+    assert [m["content"] for m in messages] == ["Antwort 28", "Frage 29", "Antwort 29"]
+
+    # Mehr Nachrichten als im Dateiende: vollständiges Parsen und Cachen
+    messages = memory_manager.get_context(user_id, max_messages=100)
+    assert len(messages) == 60
+    assert messages[0]["content"] == "Frage 0"
+    assert file_structure.get_daily_file_path(user_id) in memory_manager._parse_cache
+
+
+def test_async_append_and_get_context_v2(memory_manager):
+    """Test: Asynchrone Varianten schreiben und lesen über Worker-Threads."""
+    import asyncio
+
+    user_id = 12345
+
+    async def run():
+        await memory_manager.acreate_user(user_id)
+        await memory_manager.aappend_message(user_id, "user", "Frage")
+        await memory_manager.aappend_message(user_id, "assistant", "Antwort")
+        return await memory_manager.aget_context(user_id)
+
+    messages = asyncio.run(run())
+
+    assert [m["content"] for m in messages] == ["Frage", "Antwort"]
+
+
+def test_append_message_written_immediately_v2(memory_manager):
+    """Test: Jede Nachricht steht nach append_message bereits in der Tagesdatei."""
+    user_id = 12345
+    memory_manager.create_user(user_id)
+    daily_path = memory_manager.file_structure.get_daily_file_path(user_id)
+
+    for i in range(5):
+        assert memory_manager.append_message(user_id, "user", f"Burst {i}") is True
+        assert f"Burst {i}" in daily_path.read_text(encoding="utf-8")
+
+    content = daily_path.read_text(encoding="utf-8")
+    assert content.index("Burst 0") < content.index("Burst 4")
+
+
+def test_daily_file_writer_reused_v2(memory_manager):
+    """Test: Der Append-Deskriptor der Tagesdatei bleibt zwischen Nachrichten offen."""
+    user_id = 12345
+    memory_manager.create_user(user_id)
+
+    memory_manager.append_message(user_id, "user", "Erste")
+    _, fd = memory_manager._writers[user_id]
+
+    memory_manager.append_message(user_id, "user", "Zweite ✓")
+    assert memory_manager._writers[user_id][1] == fd
+
+    daily_path = memory_manager.file_structure.get_daily_file_path(user_id)
+    assert "Zweite ✓" in daily_path.read_text(encoding="utf-8")
+
+    memory_manager.close()
+    assert user_id not in memory_manager._writers
+    with pytest.raises(OSError):
+        os.fstat(fd)
+
+
+def test_user_dir_removed_externally_v2(memory_manager):
+    """Test: Ein von außen gelöschtes User-Verzeichnis wird bemerkt und neu angelegt."""
+    user_id = 12345
+    memory_manager.create_user(user_id)
+    memory_manager.append_message(user_id, "user", "Vorher")
+    assert memory_manager.user_exists(user_id) is True
+
+    # Z.B. Migration oder manuelles Backup in einem anderen Prozess
+    shutil.rmtree(memory_manager.file_structure.get_user_dir(user_id))
+    assert memory_manager.user_exists(user_id) is False
+
+    memory_manager.append_message(user_id, "user", "Nachher")
+
+    assert memory_manager.user_exists(user_id) is True
+    daily_path = memory_manager.file_structure.get_daily_file_path(user_id)
+    content = daily_path.read_text(encoding="utf-8")
+    assert "Nachher" in content
+    assert "Vorher" not in content
+    assert [m["content"] for m in memory_manager.get_context(user_id)] == ["Nachher"]
+
+
+def test_daily_file_removed_externally_v2(memory_manager):
+    """Test: Eine von außen entfernte Tagesdatei wird neu angelegt statt ins Leere zu schreiben."""
+    user_id = 12345
+    memory_manager.create_user(user_id)
+    memory_manager.append_message(user_id, "user", "Erste")
+
+    daily_path = memory_manager.file_structure.get_daily_file_path(user_id)
+    daily_path.unlink()
+
+    memory_manager.append_message(user_id, "user", "Zweite")
+
+    content = daily_path.read_text(encoding="utf-8")
+    assert content.startswith("# Tagesdatei")
+    assert "Zweite" in content
+
+
+def test_get_last_updated(memory_manager):
+    """Test: Letzte Aktualisierung kommt aus der mtime, memory.md bleibt unverändert."""
+    user_id = 12345
+    assert memory_manager.get_last_updated(user_id) is None
+
+    memory_manager.create_user(user_id, "TestUser")
+    memory_path = memory_manager.file_structure.get_memory_index_path(user_id)
+    index_before = memory_path.read_text(encoding="utf-8")
+
+    daily_path = memory_manager.file_structure.get_daily_file_path(user_id)
+    os.utime(daily_path, (0, 0))
+
+    memory_manager.append_message(user_id, "user", "Hallo")
+    last_updated = memory_manager.get_last_updated(user_id)
+
+    assert last_updated is not None
+    assert last_updated.timestamp() == pytest.approx(daily_path.stat().st_mtime)
+    assert last_updated.timestamp() > 0
+    assert memory_path.read_text(encoding="utf-8") == index_before
+
+
+def test_parse_v1_memory_groups_by_date(memory_manager):
+    """Test: V1-Nachrichten werden zwischen den Headern nach Datum gruppiert."""
+    content = (
+        "# Gedächtnis\n\n"
+        "### Benutzer - 2026-01-30 15:21:46\n\nHallo\n\n"
+        "### Crowdbot - 2026-01-30 15:21:50\n\nHi - wie geht's?\n\n"
+        "### Benutzer - 2026-01-31 09:00:00\n\nMorgen"
+    )
+
+    messages_by_date = memory_manager._parse_v1_memory(content)
+
+    assert list(messages_by_date) == ["2026-01-30", "2026-01-31"]
+    assert messages_by_date["2026-01-30"] == [
+        "### Benutzer - 2026-01-30 15:21:46\n\nHallo\n",
+        "### Crowdbot - 2026-01-30 15:21:50\n\nHi - wie geht's?\n",
+    ]
+    assert messages_by_date["2026-01-31"] == ["### Benutzer - 2026-01-31 09:00:00\n\nMorgen"]
+
+
 def test_migration_v1_to_v2(memory_manager, temp_data_dir):
     """Test: V1 Memory wird korrekt zu V2 migriert."""
     from src.memory_manager import MemoryManager
@@ -306,6 +456,21 @@ Was läuft heute im TV?
     assert len(trimmed_content) < original_size
 
 
+def test_soft_trim_skips_small_file(summarizer, mock_llm, file_structure):
+    """Test: Kleine Tagesdateien werden ohne LLM-Aufruf übersprungen."""
+    user_id = 12345
+    file_structure.ensure_v2_structure(user_id)
+
+    daily_path = file_structure.get_daily_file_path(user_id)
+    daily_path.write_text("# Tagesdatei\n\nKurz.", encoding="utf-8")
+
+    with patch.object(mock_llm, "send_message") as send_message:
+        assert summarizer.soft_trim_daily_file(daily_path) is True
+
+    assert daily_path.read_text(encoding="utf-8") == "# Tagesdatei\n\nKurz."
+    send_message.assert_not_called()
+
+
 def test_weekly_summary_creation(summarizer, file_structure, temp_data_dir):
     """Test: Wochenzusammenfassung wird erstellt."""
     user_id = 12345
@@ -331,6 +496,13 @@ def test_weekly_summary_creation(summarizer, file_structure, temp_data_dir):
     assert "KW 5" in content
 
 
+def test_clean_markdown(summarizer):
+    """Test: Markdown wird für TTS entfernt."""
+    text = "# Titel\n\n**fett** und *kursiv*, __fett__ und _kursiv_, `code`\n```\nblock\n```\nEnde"
+    assert summarizer._clean_markdown(text) == "Titel\n\nfett und kursiv, fett und kursiv, code\n\nEnde"
+    assert summarizer._clean_markdown("Nur Text ohne Formatierung") == "Nur Text ohne Formatierung"
+
+
 # Tests für Integration
 
 def test_complete_memory_lifecycle(memory_manager, summarizer, file_structure):
@@ -31,34 +31,46 @@ def test_is_url_with_www(search_module):
     """Testet URLs mit und ohne www."""
     assert search_module.is_url("https://www.example.com") is True
     assert search_module.is_url("http://www.test.de/path") is True
+    assert search_module.is_url("HTTPS://WWW.EXAMPLE.COM") is True
 
 
-@patch("src.search_module.requests.get")
-def test_fetch_url_success(mock_get, search_module):
+def test_fetch_url_success(search_module):
     """Testet erfolgreiches URL-Fetch."""
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.text = "Example Domain\n===========\nTest content"
-    mock_get.return_value = mock_response
+    mock_response.iter_content.return_value = iter(["Example Domain\n", "===========\nTest content"])
 
-    result = search_module.fetch_url("https://example.com")
+    with patch.object(search_module._session, "get", return_value=mock_response) as mock_get:
+        result = search_module.fetch_url("https://example.com")
 
     assert result == "Example Domain\n===========\nTest content"
     mock_get.assert_called_once()
+    assert mock_get.call_args.kwargs["stream"] is True
+    mock_response.close.assert_called_once()
 
 
-@patch("src.search_module.requests.get")
-def test_fetch_url_error(mock_get, search_module):
-    """Testet Fehlerbehandlung beim URL-Fetch."""
-    mock_get.side_effect = Exception("Connection error")
+def test_fetch_url_truncates_large_response(search_module):
+    """Testet, dass große Antworten nach FETCH_MAX_CHARS abgeschnitten werden."""
+    search_module.FETCH_MAX_CHARS = 10
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = iter(["x" * 8, "y" * 8, "z" * 8])
 
-    result = search_module.fetch_url("https://example.com")
+    with patch.object(search_module._session, "get", return_value=mock_response):
+        result = search_module.fetch_url("https://example.com")
+
+    assert result == "x" * 8 + "y" * 2
+
+
+def test_fetch_url_error(search_module):
+    """Testet Fehlerbehandlung beim URL-Fetch."""
+    with patch.object(search_module._session, "get", side_effect=Exception("Connection error")):
+        result = search_module.fetch_url("https://example.com")
 
     assert "Fehler:" in result
 
 
-@patch("src.search_module.requests.post")
-def test_deep_search_success(mock_post, search_module):
+def test_deep_search_success(search_module):
     """Testet erfolgreiche Deep Research."""
     mock_response = Mock()
     mock_response.status_code = 200
@@ -71,20 +83,18 @@ def test_deep_search_success(mock_post, search_module):
             }
         ]
     }
-    mock_post.return_value = mock_response
 
-    result = search_module.deep_search("Was ist Python?")
+    with patch.object(search_module._session, "post", return_value=mock_response) as mock_post:
+        result = search_module.deep_search("Was ist Python?")
 
     assert result == "Hier ist das Suchergebnis..."
     mock_post.assert_called_once()
 
 
-@patch("src.search_module.requests.post")
-def test_deep_search_error(mock_post, search_module):
+def test_deep_search_error(search_module):
     """Testet Fehlerbehandlung bei Deep Research."""
-    mock_post.side_effect = Exception("Connection error")
-
-    result = search_module.deep_search("Test")
+    with patch.object(search_module._session, "post", side_effect=Exception("Connection error")):
+        result = search_module.deep_search("Test")
 
     assert "Fehler:" in result
 
@@ -103,6 +113,20 @@ def test_search_with_query(search_module):
         assert result == "Search Result"
 
 
+def test_make_tts_compatible(search_module):
+    """Test: Markdown wird in vorlesbaren Fließtext umgewandelt."""
+    text = (
+        "## **Ergebnis**\n"
+        "- a=b | c\n"
+        "1. Mehr unter [Quelle](https://example.com/?q=1) oder https://test.de\n"
+        "Zeit: `3+4`"
+    )
+
+    assert search_module._make_tts_compatible(text) == (
+        "Ergebnis a, b, c Mehr unter Quelle oder Zeit, 3 und 4"
+    )
+
+
 def test_default_values(search_module):
     """Testet Default-Werte."""
     assert search_module.jina_reader_url == "https://r.jina.ai"
@@ -0,0 +1,310 @@
+"""
+Tests für den Skill Manager
+"""
+
+import json
+import os
+import pytest
+import tempfile
+import shutil
+from unittest.mock import MagicMock, patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.skill_manager import SkillManager
+
+
+USER_ID = 12345
+
+
+@pytest.fixture
+def temp_data_dir():
+    """Erstellt ein temporäres Datenverzeichnis für Tests."""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    # Cleanup
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def skill_manager(temp_data_dir):
+    """Erstellt einen SkillManager mit temporärem Datenverzeichnis."""
+    return SkillManager(data_dir=temp_data_dir)
+
+
+def make_task_manager(script: str, description: str = "Test-Skill"):
+    """Erstellt einen Mock-TaskManager mit einer erfolgreich ausgeführten Task."""
+    task_manager = MagicMock()
+    task_manager.get_task.return_value = {
+        "status": "completed",
+        "description": description,
+        "executions": [{
+            "version": 1,
+            "timestamp": "2025-01-01T12:00:00",
+            "script": script,
+            "output": "ok"
+        }]
+    }
+    return task_manager
+
+
+def save(skill_manager, skill_name: str, script: str = "print('hallo')") -> bool:
+    """Speichert einen Skill über save_skill."""
+    return skill_manager.save_skill(USER_ID, "task_001", skill_name, make_task_manager(script))
+
+
+def skills_dir(skill_manager):
+    """Gibt das Skills-Verzeichnis des Test-Benutzers zurück."""
+    return skill_manager._get_skill_dir(USER_ID)
+
+
+def test_save_skill_creates_directory(skill_manager):
+    """Test: Skill wird als Verzeichnis mit script.py und meta.json gespeichert."""
+    assert save(skill_manager, "gruss") is True
+
+    skill_path = skills_dir(skill_manager) / "gruss"
+    assert (skill_path / "script.py").read_text(encoding="utf-8") == "print('hallo')"
+
+    meta = json.loads((skill_path / "meta.json").read_text(encoding="utf-8"))
+    assert meta["name"] == "gruss"
+    assert "script" not in meta
+
+    index = json.loads((skills_dir(skill_manager) / "_index.json").read_text(encoding="utf-8"))
+    assert "gruss" in index
+
+
+def test_migrate_legacy_skill(skill_manager, temp_data_dir):
+    """Test: Skills im alten Format (<name>.json) werden ins Verzeichnisformat migriert."""
+    legacy_file = skills_dir(skill_manager) / "alt.json"
+    legacy_file.write_text(json.dumps({
+        "name": "alt",
+        "description": "Alter Skill",
+        "created_at": "2024-01-01T00:00:00",
+        "current_version": 2,
+        "script": "print('alt')"
+    }), encoding="utf-8")
+
+    skills = skill_manager.list_skills(USER_ID)
+
+    assert [skill["name"] for skill in skills] == ["alt"]
+    assert skills[0]["version"] == 2
+    assert not legacy_file.exists()
+    assert skill_manager.get_skill_script(USER_ID, "alt") == "print('alt')"
+    assert "script" not in skill_manager.get_skill(USER_ID, "alt")
+
+    # Zweiter Durchlauf (neue Instanz) ändert nichts mehr
+    second = SkillManager(data_dir=temp_data_dir)
+    assert second._migrate_legacy_skills(USER_ID) is False
+    assert [skill["name"] for skill in second.list_skills(USER_ID)] == ["alt"]
+    assert second.get_skill_script(USER_ID, "alt") == "print('alt')"
+
+
+@pytest.mark.parametrize("broken_index", [None, "{kein json", "[1, 2]"])
+def test_rebuild_index(skill_manager, temp_data_dir, broken_index):
+    """Test: Fehlender oder beschädigter Index wird aus den Skill-Verzeichnissen aufgebaut."""
+    save(skill_manager, "eins")
+    save(skill_manager, "zwei")
+
+    index_path = skills_dir(skill_manager) / "_index.json"
+    if broken_index is None:
+        index_path.unlink()
+    else:
+        index_path.write_text(broken_index, encoding="utf-8")
+
+    fresh = SkillManager(data_dir=temp_data_dir)
+    assert sorted(skill["name"] for skill in fresh.list_skills(USER_ID)) == ["eins", "zwei"]
+
+    # Der neu aufgebaute Index wird wieder gespeichert
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    assert sorted(index) == ["eins", "zwei"]
+
+
+@pytest.mark.parametrize("skill_name", ["_index", "", "..", "a/b"])
+def test_reject_invalid_skill_names(skill_manager, skill_name):
+    """Test: Reservierte Namen und Pfadangaben werden abgelehnt."""
+    assert save(skill_manager, skill_name) is False
+    assert skill_manager.get_skill(USER_ID, skill_name) is None
+    assert skill_manager.get_skill_script(USER_ID, skill_name) is None
+    assert skill_manager.delete_skill(USER_ID, skill_name) is False
+
+    success, _ = skill_manager.run_skill(USER_ID, skill_name)
+    assert success is False
+
+    # Der Index wurde nicht überschrieben
+    assert skill_manager.list_skills(USER_ID) == []
+
+
+def test_get_skill_and_script(skill_manager):
+    """Test: get_skill liefert Metadaten ohne Script, get_skill_script das Script."""
+    save(skill_manager, "rechner", "print(1 + 1)")
+
+    skill = skill_manager.get_skill(USER_ID, "rechner")
+    assert skill["name"] == "rechner"
+    assert skill["description"] == "Test-Skill"
+    assert "script" not in skill
+
+    assert skill_manager.get_skill_script(USER_ID, "rechner") == "print(1 + 1)"
+    assert skill_manager.get_skill(USER_ID, "unbekannt") is None
+    assert skill_manager.get_skill_script(USER_ID, "unbekannt") is None
+
+
+def test_delete_skill(skill_manager, temp_data_dir):
+    """Test: delete_skill entfernt Verzeichnis und Index-Eintrag."""
+    save(skill_manager, "weg")
+
+    assert skill_manager.delete_skill(USER_ID, "weg") is True
+    assert not (skills_dir(skill_manager) / "weg").exists()
+    assert skill_manager.list_skills(USER_ID) == []
+    assert skill_manager.get_skill(USER_ID, "weg") is None
+
+    index = json.loads((skills_dir(skill_manager) / "_index.json").read_text(encoding="utf-8"))
+    assert "weg" not in index
+
+    # Zweites Löschen schlägt fehl
+    assert skill_manager.delete_skill(USER_ID, "weg") is False
+
+
+def test_forget_user(skill_manager, temp_data_dir):
+    """Test: forget_user verwirft Index und Cache, z.B. nach /reset."""
+    save(skill_manager, "vorher")
+    assert skill_manager.get_skill(USER_ID, "vorher") is not None
+    assert skill_manager.list_skills(USER_ID)
+
+    # Benutzerverzeichnis wird außerhalb des SkillManagers entfernt (wie bei /reset)
+    shutil.rmtree(os.path.join(temp_data_dir, "users", str(USER_ID)))
+    skill_manager.forget_user(USER_ID)
+
+    assert all(key[0] != USER_ID for key in skill_manager._skill_cache)
+    assert skill_manager.list_skills(USER_ID) == []
+    assert skill_manager.get_skill(USER_ID, "vorher") is None
+
+    # Verzeichnis wurde neu angelegt, neue Skills funktionieren
+    assert save(skill_manager, "nachher") is True
+    assert [skill["name"] for skill in skill_manager.list_skills(USER_ID)] == ["nachher"]
+
+
+def test_run_skill_passes_args(skill_manager):
+    """Test: Argumente werden an das Script durchgereicht."""
+    save(skill_manager, "echo", "import sys\nprint(' '.join(sys.argv[1:]))")
+
+    success, output = skill_manager.run_skill(USER_ID, "echo", ["a", "b c"])
+
+    assert success is True
+    assert output.strip() == "a b c"
+
+
+def test_run_skill_reports_errors(skill_manager):
+    """Test: Exit-Code ungleich 0 liefert stderr als Fehler."""
+    save(skill_manager, "kaputt", "import sys\nsys.stderr.write('boom')\nsys.exit(3)")
+
+    success, output = skill_manager.run_skill(USER_ID, "kaputt")
+
+    assert success is False
+    assert "boom" in output
+
+
+def test_run_skill_recompiles_stale_bytecode(skill_manager):
+    """Test: Veralteter Bytecode (geändertes Script) wird neu kompiliert."""
+    save(skill_manager, "version", "print('v1')")
+    assert skill_manager.run_skill(USER_ID, "version") == (True, "v1\n")
+
+    skill_path = skills_dir(skill_manager) / "version"
+    (skill_path / "script.py").write_text("print('version 2')", encoding="utf-8")
+
+    assert skill_manager.run_skill(USER_ID, "version") == (True, "version 2\n")
+
+
+def test_run_skill_recompiles_foreign_magic(skill_manager):
+    """Test: Bytecode einer anderen Python-Version wird ersetzt."""
+    import importlib.util
+
+    save(skill_manager, "magic", "print('ok')")
+    bytecode_file = skills_dir(skill_manager) / "magic" / "script.pyc"
+    data = bytecode_file.read_bytes()
+    bytecode_file.write_bytes(b"\x00\x00\r\n" + data[4:])
+
+    assert skill_manager.run_skill(USER_ID, "magic") == (True, "ok\n")
+    assert bytecode_file.read_bytes()[:4] == importlib.util.MAGIC_NUMBER
+
+
+def test_run_skill_drops_bytecode_when_compile_fails(skill_manager):
+    """Test: Nach fehlgeschlagenem Kompilieren wird kein alter Bytecode mehr ausgeführt."""
+    save(skill_manager, "stale", "print('v1')")
+    assert skill_manager.run_skill(USER_ID, "stale") == (True, "v1\n")
+
+    skill_path = skills_dir(skill_manager) / "stale"
+    script_file = skill_path / "script.py"
+    st = script_file.stat()
+
+    # Syntaxfehler: Kompilieren schlägt fehl, alter Bytecode wird entfernt
+    script_file.write_text("print('v1'", encoding="utf-8")
+    success, _ = skill_manager.run_skill(USER_ID, "stale")
+    assert success is False
+    assert not (skill_path / "script.pyc").exists()
+
+    # Korrektur mit gleicher Größe und gleicher mtime wie die erste Version
+    script_file.write_text("print('v2')", encoding="utf-8")
+    os.utime(script_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert skill_manager.run_skill(USER_ID, "stale") == (True, "v2\n")
+
+
+def test_run_skill_bytecode_ignores_source_date_epoch(skill_manager, monkeypatch):
+    """Test: Mit SOURCE_DATE_EPOCH wird der Bytecode nicht bei jedem Lauf neu kompiliert."""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1")
+    save(skill_manager, "epoch", "print('ok')")
+
+    with patch.object(SkillManager, "_compile_script", wraps=SkillManager._compile_script) as compile_script:
+        assert skill_manager.run_skill(USER_ID, "epoch") == (True, "ok\n")
+        assert skill_manager.run_skill(USER_ID, "epoch") == (True, "ok\n")
+
+    assert compile_script.call_count <= 1
+
+
+def _process_alive(pid: int) -> bool:
+    """Prüft ob ein Prozess noch läuft (Zombies zählen als beendet)."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Prozessgruppen nur unter POSIX")
+def test_run_skill_timeout_kills_process_group(skill_manager, temp_data_dir):
+    """Test: Beim Timeout werden auch vom Script gestartete Kindprozesse beendet."""
+    import time
+
+    script = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        "with open('child.pid', 'w') as f:\n"
+        "    f.write(str(child.pid))\n"
+        "time.sleep(60)\n"
+    )
+    save(skill_manager, "haengt", script)
+    skill_manager.SKILL_TIMEOUT = 1
+
+    start = time.monotonic()
+    success, output = skill_manager.run_skill(USER_ID, "haengt")
+    elapsed = time.monotonic() - start
+
+    assert success is False
+    assert "Timeout" in output
+    # Ohne killpg würde der Enkelprozess die Pipes offen halten
+    assert elapsed < 10
+
+    pid_file = os.path.join(temp_data_dir, "users", str(USER_ID), "important", "tasks", "workspace", "child.pid")
+    with open(pid_file, "r") as f:
+        child_pid = int(f.read())
+
+    deadline = time.monotonic() + 5
+    while _process_alive(child_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_alive(child_pid)
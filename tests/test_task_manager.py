@@ -139,8 +139,53 @@ def test_update_task_status(task_manager):
     assert completed_file.exists()
 
 
+def test_update_task_status_outside_status_dir(task_manager):
+    """Test: Status ohne eigenen Ordner (running) lässt die Datei an ihrem Platz."""
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Running Test", "Beschreibung")
+    task_manager.update_task(user_id, task_id, status="completed")
+
+    assert task_manager.update_task(user_id, task_id, status="running") is True
+
+    completed_file = task_manager.file_manager.get_task_completed_dir(user_id) / f"{task_id}.md"
+    assert completed_file.exists()
+    assert task_manager.get_task(user_id, task_id)["status"] == "running"
+
+    assert task_manager.delete_task(user_id, task_id) is True
+    archived_file = task_manager.file_manager.get_task_archived_dir(user_id) / f"{task_id}.md"
+    assert archived_file.exists()
+
+
+def test_update_task_without_changes(task_manager):
+    """Test: Update ohne Änderungen schreibt die Datei nicht neu."""
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Noop Test", "Beschreibung", script="print(1)")
+
+    with patch.object(task_manager, "_write_task_markdown") as mock_write:
+        success = task_manager.update_task(user_id, task_id, status="active", script="print(1)")
+
+    assert success is True
+    mock_write.assert_not_called()
+
+
+def test_update_task_execution_bumps_updated(task_manager):
+    """Test: Eine neue Ausführung aktualisiert den Zeitstempel "updated"."""
+    import time
+
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Updated Test", "Beschreibung", script="print(1)")
+    before = task_manager.get_task(user_id, task_id)["updated"]
+
+    time.sleep(0.01)
+    assert task_manager.update_task(user_id, task_id, output="ok") is True
+
+    task = task_manager.get_task(user_id, task_id)
+    assert task["updated"] > before
+    assert task["execution_history"][-1]["output"] == "ok"
+
+
 def test_add_execution_history(task_manager):
-    """Test: Execution History wird in Markdown geschrieben."""
+    """Test: Execution History wird als JSON-Lines neben der Task gespeichert."""
     user_id = 12345
 
     # Erstelle Task
@@ -161,16 +206,17 @@ def test_add_execution_history(task_manager):
 
     assert success is True
 
-    # Prüfe dass die Datei erfolgreich aktualisiert wurde
-    task_file = task_manager.file_manager.get_task_active_dir(user_id) / f"{task_id}.md"
-    assert task_file.exists()
+    # Prüfe dass die Ausführung angehängt wurde
+    history_file = task_manager.file_manager.get_tasks_dir(user_id) / f"{task_id}.history.jsonl"
+    assert history_file.exists()
 
-    # Prüfe dass Execution-Info im Markdown steht
-    with open(task_file, "r", encoding="utf-8") as f:
-        content = f.read()
+    task_manager.update_task(user_id=user_id, task_id=task_id, output="Again!")
 
-    assert "Success!" in content
-    assert "1.23s" in content
+    task = task_manager.get_task(user_id, task_id)
+    assert len(task["execution_history"]) == 2
+    assert task["execution_history"][0]["output"] == "Success!"
+    assert task["execution_history"][0]["execution_time"] == 1.23
+    assert task["execution_history"][1]["output"] == "Again!"
 
 
 def test_list_tasks(task_manager):
@@ -198,6 +244,131 @@ def test_list_tasks(task_manager):
     assert len(all_tasks) == 3
 
 
+def test_read_task_uses_cache(task_manager):
+    """Test: Unveränderte Task-Dateien werden nur einmal geparst."""
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Cache Task", "Beschreibung", script="print(1)")
+
+    with patch.object(task_manager, "_parse_task_markdown", wraps=task_manager._parse_task_markdown) as parse:
+        task = task_manager.get_task(user_id, task_id)
+        task["execution_history"].append({"timestamp": "x"})
+        assert task_manager.get_task(user_id, task_id)["execution_history"] == []
+        assert parse.call_count == 1
+
+        # Nach einer Änderung wird neu geparst
+        task_manager.update_task(user_id, task_id, script="print(2)")
+        assert task_manager.get_task(user_id, task_id)["script"] == "print(2)"
+        assert parse.call_count == 2
+
+
+def test_read_task_cache_not_stale_after_concurrent_write(task_manager):
+    """Test: Ein während des Parsens ersetzter Inhalt bleibt nicht veraltet im Cache."""
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Race Task", "Beschreibung", script="print(1)")
+    task_file = task_manager.file_manager.get_task_active_dir(user_id) / f"{task_id}.md"
+    st = task_file.stat()
+
+    parse_task_markdown = task_manager._parse_task_markdown
+
+    def parse_with_concurrent_write(file_path):
+        # Alten Inhalt parsen, dann schreibt ein anderer Thread gleich lang
+        # und mit gleicher mtime (grobe Zeitauflösung)
+        task_data = parse_task_markdown(file_path)
+        new_task = dict(task_data, script="print(2)")
+        task_manager._write_task_markdown(task_file, new_task)
+        os.utime(task_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return task_data
+
+    with patch.object(task_manager, "_parse_task_markdown", side_effect=parse_with_concurrent_write):
+        assert task_manager._read_task_markdown(task_file)["script"] == "print(1)"
+
+    assert task_file.stat().st_size == st.st_size
+    assert task_manager._read_task_markdown(task_file)["script"] == "print(2)"
+
+
+def test_get_task_status_index(task_manager):
+    """Test: get_task findet Tasks über den Status-Index, auch nach Verschieben."""
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Index Task", "Beschreibung")
+
+    assert task_manager.get_task(user_id, task_id)["status"] == "active"
+
+    task_manager.update_task(user_id, task_id, status="completed")
+    assert task_manager.get_task(user_id, task_id)["status"] == "completed"
+
+    # Extern verschobene Datei: veralteter Index wird neu aufgebaut
+    completed_file = task_manager.file_manager.get_task_completed_dir(user_id) / f"{task_id}.md"
+    archived_file = task_manager.file_manager.get_task_archived_dir(user_id) / f"{task_id}.md"
+    completed_file.rename(archived_file)
+    assert task_manager.get_task(user_id, task_id) is not None
+
+    archived_file.unlink()
+    assert task_manager.get_task(user_id, task_id) is None
+
+
+def test_find_unknown_task_does_not_rescan(task_manager, temp_data_dir):
+    """Test: Unbekannte Task-IDs lösen keinen vollständigen Scan des Index aus."""
+    user_id = 12345
+    task_manager.create_task(user_id, "Bekannt", "Beschreibung")
+
+    # Kalter Index: genau ein Scan, danach kein weiterer für unbekannte IDs
+    fresh = TaskManager(data_dir=temp_data_dir)
+    with patch.object(fresh, "_scan_task_status_dirs", wraps=fresh._scan_task_status_dirs) as scan:
+        assert fresh.get_task(user_id, "gibt_es_nicht") is None
+        assert fresh.get_task(user_id, "auch_nicht") is None
+        assert scan.call_count == 1
+
+        # Extern angelegte Task wird ohne Scan gefunden und im Index vermerkt
+        active_dir = fresh.file_manager.get_task_active_dir(user_id)
+        shutil.copy(active_dir / "bekannt.md", active_dir / "extern.md")
+        assert fresh._find_task_file(user_id, "extern") == active_dir / "extern.md"
+        assert fresh._task_status_dirs[user_id]["extern"] == "active"
+        assert scan.call_count == 1
+
+
+def test_list_tasks_with_fields(task_manager):
+    """Test: list_tasks liefert nur die angeforderten Felder."""
+    user_id = 12345
+    task_manager.create_task(user_id, "Task 1", "Beschreibung 1")
+    task_manager.create_task(user_id, "Task 2", "Beschreibung 2")
+
+    tasks = task_manager.list_tasks(user_id, status="all", fields=("id", "status"))
+
+    assert len(tasks) == 2
+    for task in tasks:
+        assert set(task) == {"id", "status"}
+
+    # Vollständige Daten bleiben unverändert verfügbar
+    full_tasks = task_manager.list_tasks(user_id, status="all")
+    assert "script" in full_tasks[0]
+    assert "created" in full_tasks[0]
+
+
+def test_async_task_operations(task_manager):
+    """Test: Asynchrone Varianten arbeiten über Worker-Threads."""
+    import asyncio
+
+    user_id = 12345
+
+    async def run():
+        task_ids = await asyncio.gather(*[
+            task_manager.acreate_task(user_id, "Async Task", f"Beschreibung {i}")
+            for i in range(5)
+        ])
+        tasks = await task_manager.alist_tasks(user_id)
+        task = await task_manager.aget_task(user_id, task_ids[0])
+        deleted = await task_manager.adelete_task(user_id, task_ids[0])
+        return task_ids, tasks, task, deleted
+
+    task_ids, tasks, task, deleted = asyncio.run(run())
+
+    # Gleichzeitig erstellte Tasks bekommen eindeutige IDs
+    assert len(set(task_ids)) == 5
+    assert len(tasks) == 5
+    assert task["id"] == task_ids[0]
+    assert deleted is True
+
+
 def test_delete_task(task_manager):
     """Test: Task wird archiviert."""
     user_id = 12345
@@ -411,6 +582,21 @@ def test_duplicate_task_names(task_manager):
     assert task_id3 == "duplikat_test_v3"
 
 
+def test_create_task_scans_status_dirs_once(task_manager):
+    """Test: Der Status-Index wird nur beim ersten create_task gescannt."""
+    user_id = 12345
+
+    with patch.object(
+        task_manager, "_scan_task_status_dirs", wraps=task_manager._scan_task_status_dirs
+    ) as scan:
+        task_manager.create_task(user_id=user_id, name="Scan Test", description="Erste")
+        task_manager.create_task(user_id=user_id, name="Scan Test", description="Zweite")
+        task_id = task_manager.create_task(user_id=user_id, name="Scan Test", description="Dritte")
+
+    assert scan.call_count == 1
+    assert task_id == "scan_test_v3"
+
+
 def test_validate_execution_output_valid(task_manager):
     """Test: Validierung erkennt korrekte Ausgabe."""
     from unittest.mock import MagicMock
@@ -503,6 +689,55 @@ def test_run_task_with_validation(task_manager):
     assert mock_llm.chat.call_count >= 1
 
 
+def test_run_task_saves_generated_script_once(task_manager):
+    """Test: Generiertes Script und Ergebnis werden in einem Schreibvorgang gespeichert."""
+    from unittest.mock import MagicMock
+
+    user_id = 12345
+    task_id = task_manager.create_task(user_id, "Generate Test", "Gib 42 aus")
+
+    mock_llm = MagicMock()
+    mock_llm.chat.side_effect = ["print(42)", "APPROVED", "VALID: korrekt"]
+
+    with patch.object(task_manager, "_write_task_markdown", wraps=task_manager._write_task_markdown) as mock_write:
+        success, output = task_manager.run_task(user_id, task_id, mock_llm)
+
+    assert success is True
+    assert output == "42"
+    assert mock_write.call_count == 1
+
+    task = task_manager.get_task(user_id, task_id)
+    assert task["script"] == "print(42)"
+    assert task["status"] == "completed"
+    assert len(task["execution_history"]) == 1
+
+
+def test_run_task_script_environment(task_manager):
+    """Test: Task-Scripts laufen als Datei (__file__, sys.argv) mit leerem stdin."""
+    from unittest.mock import MagicMock
+
+    user_id = 12345
+    script = (
+        "import os, sys\n"
+        "print(os.path.isfile(__file__))\n"
+        "print(sys.argv[0] == __file__, sys.argv[1])\n"
+        "print(repr(sys.stdin.read()))\n"
+        "try:\n"
+        "    input()\n"
+        "except EOFError:\n"
+        "    print('EOF')\n"
+    )
+    task_id = task_manager.create_task(user_id, "Env Test", "Umgebung prüfen", script=script)
+
+    mock_llm = MagicMock()
+    mock_llm.chat.return_value = "VALID: ok"
+
+    success, output = task_manager.run_task(user_id, task_id, mock_llm, user_input="eingabe")
+
+    assert success is True
+    assert output.splitlines() == ["True", "True eingabe", "''", "EOF"]
+
+
 def test_improved_script_generation_with_user_agent(task_manager):
     """Test: Verbesserter Prompt generiert Scripts mit User-Agent."""
     from unittest.mock import MagicMock